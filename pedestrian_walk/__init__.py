@@ -0,0 +1,9 @@
+from .city import (
+    STRATEGY_DIAGONALLY,
+    STRATEGY_HORIZONTALLY,
+    STRATEGY_RANDOM,
+    STRATEGY_VERTICALLY,
+    STRATEGYS,
+)
+from .config import SimulationConfig
+from .kernels import KERNELS, run
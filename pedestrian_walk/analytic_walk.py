@@ -0,0 +1,138 @@
+from .city import (
+    STRATEGY_DIAGONALLY,
+    STRATEGY_HORIZONTALLY,
+    STRATEGY_RANDOM,
+    STRATEGY_VERTICALLY,
+    TRAFFIC_LIGHTS_ALTERNATION_TIME,
+    time_to_cross_street,
+    time_to_walk_street,
+    trip_crossings,
+    trip_streets,
+)
+from .config import SimulationConfig
+
+# Every light gets an independent uniform offset, so the phase a walker finds
+# when reaching a light it has not seen yet is uniform no matter when it
+# arrives, and its green direction is a fair coin. The only phase carried
+# from one light to the next is at the last row or column, where the walk
+# crosses the same light twice in a row; that case has a closed form too, so
+# the expectations below are exact and need no phase bins.
+
+
+def expected_wait_at_light() -> float:
+    # both directions are useful: only wait when there is not enougth time,
+    # the light then turns to the other direction which is just as good
+    return time_to_cross_street() ** 2 / (2 * TRAFFIC_LIGHTS_ALTERNATION_TIME)
+
+
+def expected_wait_at_single_direction_light() -> float:
+    # only one direction is useful, the other half of the time it is red
+    alternation = TRAFFIC_LIGHTS_ALTERNATION_TIME
+    cross = time_to_cross_street()
+    return (
+        cross**2 / (2 * alternation)
+        + cross / 2
+        + (alternation**2 - cross**2) / (4 * alternation)
+    )
+
+
+def expected_wait_at_same_light() -> float:
+    # right after crossing one direction the other one is still red, so the
+    # wait is whatever was left of the phase minus the crossing; the phase
+    # was full if the walker had waited for it, uniform above the crossing
+    # time otherwise
+    alternation = TRAFFIC_LIGHTS_ALTERNATION_TIME
+    cross = time_to_cross_street()
+    return (cross / alternation) * (alternation - cross) + (
+        alternation - cross
+    ) ** 2 / (2 * alternation)
+
+
+def probability_of_horizontal(
+    strategy: int, remaining_horizontal: int, remaining_vertical: int
+) -> float:
+    # direction taken at an intersection without traffic light
+    if strategy == STRATEGY_RANDOM:
+        return 0.5
+    if strategy == STRATEGY_HORIZONTALLY:
+        return 1
+    if strategy == STRATEGY_VERTICALLY:
+        return 0
+    if strategy == STRATEGY_DIAGONALLY:
+        return 1 if remaining_horizontal >= remaining_vertical else 0
+    raise ValueError(f"Unknown strategy {strategy}")
+
+
+def expected_times(
+    city_size: int,
+    probability_of_traffic_light: float = 1,
+    strategy: int = STRATEGY_DIAGONALLY,
+) -> tuple:
+    # dynamic programming over the lights reached from their first corner,
+    # (i, j) has city_size - i horizontal and city_size - j vertical
+    # crossings left; returns the expected time and the expected waiting time
+    end = city_size * 2 - 1
+    last = city_size - 1
+    light = probability_of_traffic_light
+
+    both = expected_wait_at_light()
+    single = expected_wait_at_single_direction_light()
+    same = expected_wait_at_same_light()
+
+    expected_waiting_time = 0
+    reach = [[0.0] * city_size for _ in range(city_size)]
+    reach[0][0] = 1.0
+
+    for i in range(city_size):
+        for j in range(city_size):
+            probability = reach[i][j]
+            if probability == 0:
+                continue
+
+            horizontal = probability_of_horizontal(
+                strategy, city_size - i, city_size - j
+            )
+            with_light_horizontal = light * 0.5
+            without_light_horizontal = (1 - light) * horizontal
+            with_light_vertical = light * 0.5
+            without_light_vertical = (1 - light) * (1 - horizontal)
+
+            waiting = light * both
+
+            # once the last column or row is reached the rest of the walk is
+            # forced: the same light again and then one light per block
+            if i == last:
+                waiting += with_light_horizontal * (same + (last - j) * light * single)
+                waiting += without_light_horizontal * (last - j) * light * single
+            else:
+                reach[i + 1][j] += probability * (
+                    with_light_horizontal + without_light_horizontal
+                )
+
+            if j == last:
+                waiting += with_light_vertical * (same + (last - i) * light * single)
+                waiting += without_light_vertical * (last - i) * light * single
+            else:
+                reach[i][j + 1] += probability * (
+                    with_light_vertical + without_light_vertical
+                )
+
+            expected_waiting_time += probability * waiting
+
+    walking_time = (
+        trip_streets(0, end) * 2 * time_to_walk_street()
+        + trip_crossings(0, end) * 2 * time_to_cross_street()
+    )
+
+    return walking_time + expected_waiting_time, expected_waiting_time
+
+
+def run_experiments(config: SimulationConfig) -> tuple:
+    # the exact expectation times the experiments, the seed is not used
+    expected_time, expected_waiting_time = expected_times(
+        config.city_size, config.probability_of_traffic_light, config.strategy
+    )
+    return (
+        expected_time * config.number_of_experiments,
+        expected_waiting_time * config.number_of_experiments,
+    )
@@ -0,0 +1,107 @@
+import numpy as np
+
+from .city import HORIZONTAL, VERTICAL, time_to_cross_street, time_to_walk_street
+from .crowd_simulation import crossings_between
+from .vectorized_walk import cross_lights
+
+
+def random_corners(
+    city_size: int, number_of_corners: int, rng: np.random.Generator
+) -> np.ndarray:
+    return rng.integers(0, city_size * 2, size=(number_of_corners, 2))
+
+
+def simulate_trips(
+    traffic_ligths,
+    origins: np.ndarray,
+    destinations: np.ndarray,
+    departure_times: np.ndarray = None,
+    strategy: int = None,
+    rng: np.random.Generator = None,
+) -> tuple:
+    # the walks of CrowdSimulation, from any corner to any other in any
+    # direction, for all the trips in one vectorized pass over a single city:
+    # traffic_ligths is a TrafficLightGrid or a HashedTrafficLights of one
+    # experiment, origins and destinations have a corner per row; the trips
+    # advance a crossing per iteration, sorted by their number of crossings so
+    # the ones still walking are always a prefix of the arrays; returns the
+    # arrival time and the waiting time of every trip in the order given
+    if len(traffic_ligths) != 1:
+        raise ValueError("The trips must share a single city of traffic lights")
+    origins = np.asarray(origins, dtype=np.int64).reshape(-1, 2)
+    destinations = np.asarray(destinations, dtype=np.int64).reshape(-1, 2)
+    if origins.shape != destinations.shape:
+        raise ValueError("Every origin needs a destination")
+    limit = traffic_ligths.city_size * 2
+    if ((origins < 0) | (origins >= limit)).any() or (
+        (destinations < 0) | (destinations >= limit)
+    ).any():
+        raise ValueError("There are corners out of the city")
+
+    number_of_trips = len(origins)
+    if departure_times is None:
+        departure_times = np.zeros(number_of_trips)
+    if np.shape(departure_times) != (number_of_trips,):
+        raise ValueError("Every trip needs a departure time")
+    missing_lights = traffic_ligths.has_missing_lights
+    if missing_lights and strategy is None:
+        raise ValueError("A strategy is needed for intersections without lights")
+    rng = np.random.default_rng() if rng is None else rng
+
+    crossings = crossings_between(origins, destinations)
+    order = np.argsort(-crossings.sum(axis=1), kind="stable")
+    total_crossings = crossings.sum(axis=1)[order]
+
+    # a coordinate per row and a trip per column, like simulate_walks
+    position = origins[order].T.copy()
+    step = np.where(destinations[order] >= origins[order], 1, -1).T.copy()
+    remaining_crossings = crossings[order].T.copy()
+    remaining_streets = (
+        np.abs(destinations[order] - origins[order]).T - remaining_crossings
+    )
+    current_time = np.asarray(departure_times, dtype=np.float64)[order]
+    waiting_time = np.zeros(number_of_trips)
+
+    # the iteration k walks the streets of the trips with at least k
+    # crossings and crosses once those with more than k
+    descending = -total_crossings
+    for k in range(total_crossings.max(initial=0) + 1):
+        n = np.searchsorted(descending, -k, "right")
+        # every street ahead is walked before any crossing, a move from m to
+        # m + 1 or back with an odd m is a street
+        for direction in (HORIZONTAL, VERTICAL):
+            coordinate = position[direction, :n]
+            walk = (remaining_streets[direction, :n] > 0) & (
+                (coordinate - (step[direction, :n] < 0)) & 1 == 1
+            )
+            current_time[:n] += walk * time_to_walk_street()
+            coordinate += walk * step[direction, :n]
+            remaining_streets[direction, :n] -= walk
+
+        n = np.searchsorted(descending, -k, "left")
+        if n == 0:
+            break
+        x, y = position[:, :n]
+        light = traffic_ligths.light_index(0, x // 2, y // 2)
+        horizontal, _, _, _ = cross_lights(
+            traffic_ligths,
+            light,
+            current_time[:n],
+            waiting_time[:n],
+            remaining_crossings[:, :n],
+            strategy,
+            rng,
+        )
+        vertical = ~horizontal
+
+        current_time[:n] += time_to_cross_street()
+        x += horizontal * step[0, :n]
+        y += vertical * step[1, :n]
+        remaining_crossings[0, :n] -= horizontal
+        remaining_crossings[1, :n] -= vertical
+
+    arrival_times = np.empty(number_of_trips)
+    waiting_times = np.empty(number_of_trips)
+    arrival_times[order] = current_time
+    waiting_times[order] = waiting_time
+    return arrival_times, waiting_times
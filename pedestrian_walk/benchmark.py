@@ -0,0 +1,195 @@
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from .city import STRATEGY_DIAGONALLY, create_traffic_ligths, trip_crossings
+from .config import SimulationConfig
+from .crowd_simulation import CrowdSimulation
+from .kernels import KERNELS
+from .traffic_light_grid import TrafficLightGrid
+from .vectorized_walk import simulate_walks
+from .walk import run_experiments
+from .walk_counters import WalkCounters
+
+BENCHMARK_FILE = "benchmark.json"
+
+CITY_SIZES = [7, 20, 50]
+PROBABILITIES_OF_TRAFFIC_LIGHT = [1, 0.5]
+
+# the scalar loops are a hundred times slower, so they get fewer experiments
+SCALAR_EXPERIMENTS = [30, 300]
+FAST_EXPERIMENTS = [10000, 100000]
+
+# best of, after a warm up run of the same case
+REPEATS = 3
+
+SEED = 0
+
+
+def run_crowd(config: SimulationConfig):
+    # every experiment is a pedestrian crossing the same city
+    rng = random.Random(config.seed)
+    traffic_ligths = create_traffic_ligths(
+        config.city_size, config.probability_of_traffic_light, rng
+    )
+    crowd = CrowdSimulation(traffic_ligths, config.strategy, rng)
+    for _ in range(config.number_of_experiments):
+        crowd.add_pedestrian((0, 0), config.end_point)
+    crowd.run()
+
+
+# name: (kernel, experiments)
+ENGINES = {
+    "scalar": (KERNELS["scalar"], SCALAR_EXPERIMENTS),
+    "vectorized": (KERNELS["vectorized"], FAST_EXPERIMENTS),
+    "hashed": (KERNELS["hashed"], FAST_EXPERIMENTS),
+    "crowd": (run_crowd, SCALAR_EXPERIMENTS),
+}
+
+
+def cases(engines: list = None) -> list:
+    return [
+        {
+            "engine": engine,
+            "city_size": city_size,
+            "probability_of_traffic_light": probability,
+            "number_of_experiments": number_of_experiments,
+        }
+        for engine, (_, experiments) in ENGINES.items()
+        if engines is None or engine in engines
+        for city_size in CITY_SIZES
+        for probability in PROBABILITIES_OF_TRAFFIC_LIGHT
+        for number_of_experiments in experiments
+    ]
+
+
+def measure(case: dict) -> dict:
+    # runs in its own process, so the peak memory is the one of this case
+    kernel = ENGINES[case["engine"]][0]
+    config = SimulationConfig(
+        city_size=case["city_size"],
+        probability_of_traffic_light=case["probability_of_traffic_light"],
+        strategy=STRATEGY_DIAGONALLY,
+        number_of_experiments=case["number_of_experiments"],
+        seed=SEED,
+    )
+
+    kernel(config)
+    elapsed = math.inf
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        kernel(config)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    end = case["city_size"] * 2 - 1
+    steps = case["number_of_experiments"] * trip_crossings(0, end) * 2
+
+    return {
+        **case,
+        "seconds": elapsed,
+        "experiments_per_second": case["number_of_experiments"] / elapsed,
+        "ns_per_step": elapsed / steps * 1e9,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _peak_rss_mb() -> float:
+    # resource is unix only, nan elsewhere
+    try:
+        import resource
+    except ImportError:
+        return math.nan
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on linux
+    if sys.platform == "darwin":
+        return peak_rss / 1024**2
+    return peak_rss / 1024
+
+
+def run_case(case: dict) -> dict:
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pedestrian_walk",
+            "benchmark",
+            "--case",
+            json.dumps(case),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(process.stdout)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_counters(config: SimulationConfig):
+    # where the steps of each loop go
+    print("scalar")
+    counters = WalkCounters()
+    run_experiments(config, counters)
+    print(counters.report())
+
+    print()
+    print("vectorized")
+    counters = WalkCounters()
+    rng = np.random.default_rng(config.seed)
+    simulate_walks(
+        TrafficLightGrid.random(
+            config.number_of_experiments,
+            config.city_size,
+            rng,
+            config.probability_of_traffic_light,
+        ),
+        config.strategy,
+        rng,
+        counters,
+    )
+    print(counters.report())
+
+
+def run_benchmark(engines: list = None, output: str = BENCHMARK_FILE):
+    results = []
+    for case in cases(engines):
+        result = run_case(case)
+        results.append(result)
+        print(
+            f"{result['engine']:>10} size {result['city_size']:>3}",
+            f"p {result['probability_of_traffic_light']:<4}",
+            f"n {result['number_of_experiments']:>6}:",
+            f"{result['experiments_per_second']:>12.0f} experiments/s",
+            f"{result['ns_per_step']:>9.0f} ns/step",
+            f"{result['peak_rss_mb']:>7.1f} MB",
+        )
+
+    with open(output, "w") as file:
+        json.dump(
+            {
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
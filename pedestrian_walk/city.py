@@ -0,0 +1,139 @@
+import random
+
+HORIZONTAL = 0
+VERTICAL = 1
+
+HUMAN_VELOCITY = 1.3  # m/s
+STREET_LENGTH = 100  # m
+STREET_WIDTH = 9  # m
+
+TRAFFIC_LIGHTS_ALTERNATION_TIME = 60  # s
+
+START_POINT = (0, 0)
+
+STRATEGY_RANDOM = 0
+STRATEGY_HORIZONTALLY = 1
+STRATEGY_VERTICALLY = 2
+STRATEGY_DIAGONALLY = 3
+
+STRATEGYS = [
+    STRATEGY_RANDOM,
+    STRATEGY_HORIZONTALLY,
+    STRATEGY_VERTICALLY,
+    STRATEGY_DIAGONALLY,
+]
+
+
+class TrafficLight:
+    def __init__(self, rng: random.Random = random):
+        self.initial_green_direction = rng.choice([HORIZONTAL, VERTICAL])
+        self.initial_time = rng.random() * TRAFFIC_LIGHTS_ALTERNATION_TIME
+
+    def _is_initial_green(self, current_time: float) -> bool:
+        return (
+            (current_time + self.initial_time) // TRAFFIC_LIGHTS_ALTERNATION_TIME
+        ) % 2 == 0
+
+    def is_green(self, current_time: float, direction: int) -> bool:
+        # XNOR
+        return self._is_initial_green(current_time) == (
+            direction == self.initial_green_direction
+        )
+
+    def time_to_change(self, current_time: float) -> float:
+        return TRAFFIC_LIGHTS_ALTERNATION_TIME - (
+            (current_time + self.initial_time) % TRAFFIC_LIGHTS_ALTERNATION_TIME
+        )
+
+    def which_direction_is_green(self, current_time: float) -> int:
+        return (
+            self.initial_green_direction
+            if self._is_initial_green(current_time)
+            else 1 - self.initial_green_direction
+        )
+
+    def is_enougth_time_to_cross(self, current_time: float) -> bool:
+        return self.time_to_change(current_time) > time_to_cross_street()
+
+    def waiting_time_to_cross(self, current_time: float, direction: int) -> float:
+        if self.which_direction_is_green(current_time) != direction:
+            return self.time_to_change(current_time)
+        if self.is_enougth_time_to_cross(current_time):
+            return 0
+        # the other direction gets the next green, wait for the one after it
+        return self.time_to_change(current_time) + TRAFFIC_LIGHTS_ALTERNATION_TIME
+
+
+def time_to_cross_street() -> float:
+    return STREET_WIDTH / HUMAN_VELOCITY
+
+
+def time_to_walk_street() -> float:
+    return STREET_LENGTH / HUMAN_VELOCITY
+
+
+def int_to_direction(direction: int) -> str:
+    return "horizontal" if direction == HORIZONTAL else "vertical"
+
+
+def int_to_strategy(strategy: int) -> str:
+    if strategy == STRATEGY_RANDOM:
+        return "random"
+    if strategy == STRATEGY_HORIZONTALLY:
+        return "horizontally"
+    if strategy == STRATEGY_VERTICALLY:
+        return "vertically"
+    if strategy == STRATEGY_DIAGONALLY:
+        return "diagonally"
+
+
+def strategy_from_name(name: str) -> int:
+    for strategy in STRATEGYS:
+        if int_to_strategy(strategy) == name:
+            return strategy
+    raise ValueError(f"Unknown strategy {name}")
+
+
+def trip_crossings(s: int, e: int) -> int:
+    return (e - s) // 2 + (e - s) % 2
+
+
+def trip_streets(s: int, e: int) -> int:
+    return (e - s) - trip_crossings(s, e)
+
+
+def can_walk_street(coordiate: int) -> bool:
+    return coordiate % 2 == 1
+
+
+def can_cross_street(coordiate: int) -> bool:
+    return coordiate % 2 == 0
+
+
+def end_point_of(city_size: int) -> tuple:
+    return (city_size * 2 - 1, city_size * 2 - 1)
+
+
+def traffic_ligth_from_position(position: tuple, traffic_ligths: list) -> TrafficLight:
+    return traffic_ligths[position[0] // 2][position[1] // 2]
+
+
+def create_traffic_ligths(
+    city_size: int,
+    probability_of_traffic_light: float = 1,
+    rng: random.Random = random,
+) -> list:
+    # None where there is no light; with lights everywhere no presence is
+    # drawn, so the lights are the same ones main.py used to draw
+    if probability_of_traffic_light >= 1:
+        return [
+            [TrafficLight(rng) for _ in range(city_size + 1)]
+            for _ in range(city_size + 1)
+        ]
+    return [
+        [
+            (TrafficLight(rng) if rng.random() < probability_of_traffic_light else None)
+            for _ in range(city_size + 1)
+        ]
+        for _ in range(city_size + 1)
+    ]
@@ -0,0 +1,337 @@
+import heapq
+import itertools
+import random
+
+import numpy as np
+
+from .city import (
+    HORIZONTAL,
+    START_POINT,
+    STRATEGYS,
+    VERTICAL,
+    can_cross_street,
+    create_traffic_ligths,
+    time_to_cross_street,
+    time_to_walk_street,
+    traffic_ligth_from_position,
+)
+from .config import SimulationConfig
+from .crowd_simulation import crossings_between
+from .grafo import Grafo, GrafoCSR
+from .walk import walk
+
+# decimals of a second that tell two A* estimates apart
+TIE = 6
+
+
+def create_square_city(size: int) -> Grafo:
+    esquinas = [(x, y) for x in range((size + 1) * 2) for y in range((size + 1) * 2)]
+    city = Grafo(True, esquinas)
+
+    # tengo que agregar las aristas que unan a las esquinas, las que vayan de
+    # par a impar (cruce peatonal) tienen peso tiempo de cruce y los que vayan
+    # de impar a par (cuadra) tienen peso tiempo de cuadra
+    for i in range(size + 1):
+        for j in range(size + 1):
+            city.arista((i * 2, j * 2), (i * 2 + 1, j * 2), time_to_cross_street())
+            city.arista((i * 2, j * 2), (i * 2, j * 2 + 1), time_to_cross_street())
+
+            city.arista(
+                (i * 2 + 1, j * 2), (i * 2 + 1, j * 2 + 1), time_to_cross_street()
+            )
+            city.arista(
+                (i * 2, j * 2 + 1), (i * 2 + 1, j * 2 + 1), time_to_cross_street()
+            )
+
+    for i in range(size + 1):
+        for j in range(size + 1):
+            if i < size:
+                city.arista(
+                    (i * 2 + 1, j * 2), (i * 2 + 2, j * 2), time_to_walk_street()
+                )
+
+                city.arista(
+                    (i * 2 + 1, j * 2 + 1),
+                    (i * 2 + 2, j * 2 + 1),
+                    time_to_walk_street(),
+                )
+
+            if j < size:
+                city.arista(
+                    (i * 2, j * 2 + 1), (i * 2, j * 2 + 2), time_to_walk_street()
+                )
+
+                city.arista(
+                    (i * 2 + 1, j * 2 + 1),
+                    (i * 2 + 1, j * 2 + 2),
+                    time_to_walk_street(),
+                )
+
+    return city
+
+
+def create_square_city_csr(size: int) -> GrafoCSR:
+    # the same graph as create_square_city built from arrays: every corner
+    # but the last of its row or column has an edge to the next one, a
+    # crossing when the coordinate is even and a street when it is odd; the
+    # edges are generated in the order of GrafoCSR so they need no sorting
+    limit = (size + 1) * 2
+    corners = np.arange(limit * limit, dtype=np.int32)
+    x, y = np.divmod(corners, limit)
+    edges = (y < limit - 1).astype(np.int32) + (x < limit - 1)
+
+    # per corner, the edge to (x, y + 1) and then the one to (x + 1, y)
+    starts = np.cumsum(edges) - edges
+    origin = np.repeat(corners, edges)
+    x, y = np.divmod(origin, limit)
+    vertical = (np.arange(len(origin)) == starts[origin]) & (y < limit - 1)
+    moved = np.where(vertical, y, x)
+    pesos = np.where(moved % 2 == 0, time_to_cross_street(), time_to_walk_street())
+
+    return GrafoCSR.desde_aristas(
+        np.column_stack([x, y]),
+        np.column_stack([x + ~vertical, y + vertical]),
+        pesos,
+        es_dirigido=True,
+        forma=(limit, limit),
+    )
+
+
+class ImplicitSquareCity:
+    # the graph of create_square_city computed instead of stored: corners
+    # (x, y) with 0 <= x, y < (size + 1) * 2 and edges to (x + 1, y) and
+    # (x, y + 1), a crossing from an even coordinate and a street from an odd
+    # one but the last; same interface as GrafoCSR, in constant memory
+    es_dirigido = True
+
+    def __init__(self, size: int):
+        self.size = size
+        self.limit = (size + 1) * 2
+
+    def __contains__(self, v):
+        return (
+            isinstance(v, tuple)
+            and len(v) == 2
+            and all(isinstance(c, int) and 0 <= c < self.limit for c in v)
+        )
+
+    def _validar_vertice(self, v):
+        if v not in self:
+            raise IndexError("Vertice " + str(v) + " no esta en el grafo")
+
+    def _peso_desde(self, c):
+        # the edge from coordinate c to c + 1, None if there is none
+        if can_cross_street(c):
+            return time_to_cross_street()
+        if c < self.limit - 2:
+            return time_to_walk_street()
+        return None
+
+    def adyacentes_con_peso(self, v):
+        self._validar_vertice(v)
+        x, y = v
+        adyacentes = []
+        peso = self._peso_desde(x)
+        if peso is not None:
+            adyacentes.append(((x + 1, y), peso))
+        peso = self._peso_desde(y)
+        if peso is not None:
+            adyacentes.append(((x, y + 1), peso))
+        return adyacentes
+
+    def adyacentes(self, v):
+        return [w for w, _ in self.adyacentes_con_peso(v)]
+
+    def hay_arista(self, v, w):
+        self._validar_vertice(w)
+        return w in self.adyacentes(v)
+
+    def peso_arista(self, v, w):
+        for vecino, peso in self.adyacentes_con_peso(v):
+            if vecino == w:
+                return peso
+        raise ValueError("Los vertices " + str(v) + " y " + str(w) + " no estan unidos")
+
+    def keys(self):
+        return list(self)
+
+    def random(self):
+        return (random.randrange(self.limit), random.randrange(self.limit))
+
+    def __iter__(self):
+        return itertools.product(range(self.limit), repeat=2)
+
+    def __repr__(self):
+        cadena = "{\n"
+        for v in self:
+            cadena += "\t" + str(v) + ": ["
+            cadena += ", ".join(str(w) for w in self.adyacentes(v))
+            cadena += "]\n"
+        cadena += "}"
+        return cadena
+
+    def __str__(self):
+        return repr(self)
+
+    def __len__(self):
+        return self.limit**2
+
+
+def crossing_direction(v: tuple, w: tuple) -> int:
+    # None for the edges that walk a street instead of crossing one
+    direction = HORIZONTAL if v[0] != w[0] else VERTICAL
+    return direction if can_cross_street(v[direction]) else None
+
+
+def search_space(city) -> tuple:
+    # GrafoCSR is searched over its integer ids and contiguous edge arrays,
+    # Grafo directly over its vertices
+    if isinstance(city, GrafoCSR):
+        return city.indice, city.adyacentes_por_indice
+    return (
+        lambda v: v,
+        lambda v: ((w, w, peso) for w, peso in city.adyacentes_con_peso(v)),
+    )
+
+
+def walking_time_heuristic(destination: tuple):
+    # the streets and crossings between a corner and the destination walked
+    # without waiting, a lower bound of any route with or without lights
+    def heuristic(position: tuple) -> float:
+        crossings = crossings_between(position[0], destination[0]) + crossings_between(
+            position[1], destination[1]
+        )
+        moves = abs(destination[0] - position[0]) + abs(destination[1] - position[1])
+        return (
+            crossings * time_to_cross_street()
+            + (moves - crossings) * time_to_walk_street()
+        )
+
+    return heuristic
+
+
+def _no_heuristic(position: tuple) -> float:
+    # plain dijkstra
+    return 0
+
+
+def a_star(
+    city: Grafo,
+    traffic_ligths: list,
+    origin: tuple,
+    destination: tuple,
+    heuristic=None,
+    departure_time: float = 0,
+) -> tuple:
+    # time dependent A*, lights wait in FIFO order (leaving later never
+    # arrives earlier) and never shorten an edge, so with a heuristic that
+    # does not overestimate any edge the first time a vertex is popped is its
+    # earliest arrival; without traffic_ligths the weights are static;
+    # estimates are compared to TIE seconds and ties go to the vertex closest
+    # to the destination, so an exact heuristic expands a single route
+    # instead of every route that only differs by rounding; returns the
+    # route, the arrival time, the time spent waiting and the number of
+    # vertices expanded
+    key, neighbours = search_space(city)
+    start = key(origin)
+    end = key(destination)
+    if heuristic is None:
+        heuristic = _no_heuristic
+
+    arrival = {start: departure_time}
+    waiting = {start: 0}
+    parent = {start: None}
+    position = {start: origin}
+    visited = set()
+    estimate = heuristic(origin)
+    heap = [(round(departure_time + estimate, TIE), estimate, start)]
+
+    while heap:
+        _, _, v = heapq.heappop(heap)
+        if v in visited:
+            continue
+        visited.add(v)
+
+        if v == end:
+            break
+
+        current_time = arrival[v]
+        current_position = position[v]
+        for w, next_position, peso in neighbours(v):
+            if w in visited:
+                continue
+
+            waiting_time = 0
+            direction = crossing_direction(current_position, next_position)
+            if direction is not None and traffic_ligths is not None:
+                traffic_light = traffic_ligth_from_position(
+                    current_position, traffic_ligths
+                )
+                if traffic_light is not None:
+                    waiting_time = traffic_light.waiting_time_to_cross(
+                        current_time, direction
+                    )
+
+            arrival_time = current_time + waiting_time + peso
+            if w not in arrival or arrival_time < arrival[w]:
+                arrival[w] = arrival_time
+                waiting[w] = waiting[v] + waiting_time
+                parent[w] = v
+                position[w] = next_position
+                estimate = heuristic(next_position)
+                heapq.heappush(heap, (round(arrival_time + estimate, TIE), estimate, w))
+
+    if end not in visited:
+        raise ValueError(f"{destination} can not be reached from {origin}")
+
+    route = []
+    v = end
+    while v is not None:
+        route.append(position[v])
+        v = parent[v]
+    route.reverse()
+
+    return route, arrival[end], waiting[end], len(visited)
+
+
+def earliest_arrival(
+    city: Grafo,
+    traffic_ligths: list,
+    origin: tuple,
+    destination: tuple,
+    departure_time: float = 0,
+) -> tuple:
+    # time dependent dijkstra; returns the route, the arrival time and the
+    # time spent waiting
+    route, arrival_time, waiting_time, _ = a_star(
+        city, traffic_ligths, origin, destination, departure_time=departure_time
+    )
+    return route, arrival_time, waiting_time
+
+
+def compare_with_optimal(
+    config: SimulationConfig, strategies: list = STRATEGYS
+) -> tuple:
+    # average time of the optimal route and of every strategy on the same
+    # cities, config.strategy is not used
+    rng = random.Random(config.seed)
+    city = create_square_city(config.city_size)
+
+    optimal_time = 0
+    times = {strategy: 0 for strategy in strategies}
+
+    for _ in range(config.number_of_experiments):
+        traffic_ligths = create_traffic_ligths(
+            config.city_size, config.probability_of_traffic_light, rng
+        )
+
+        _, arrival_time, _ = earliest_arrival(
+            city, traffic_ligths, START_POINT, config.end_point
+        )
+        optimal_time += arrival_time / config.number_of_experiments
+
+        for strategy in strategies:
+            time, _ = walk(traffic_ligths, config.end_point, strategy, rng)
+            times[strategy] += time / config.number_of_experiments
+
+    return optimal_time, times
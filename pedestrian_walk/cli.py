@@ -0,0 +1,730 @@
+import argparse
+import json
+import math
+import random
+import time
+from dataclasses import replace
+
+import numpy as np
+
+from . import benchmark
+from .analytic_walk import expected_times
+from .batched_trips import random_corners, simulate_trips
+from .city import (
+    START_POINT,
+    STRATEGYS,
+    STREET_LENGTH,
+    create_traffic_ligths,
+    int_to_direction,
+    int_to_strategy,
+    strategy_from_name,
+    trip_crossings,
+    trip_streets,
+)
+from .city_as_graph import (
+    ImplicitSquareCity,
+    a_star,
+    compare_with_optimal,
+    create_square_city_csr,
+    crossing_direction,
+    walking_time_heuristic,
+)
+from .config import SimulationConfig
+from .crossing_policy import PHASE_BINS, solve_policy
+from .crowd_simulation import LOOKAHEAD, CrowdSimulation, random_corner
+from .result_cache import CACHE_DIRECTORY
+from .grafo import GrafoCSR
+from .kernels import KERNELS, SKETCH_KERNELS, run, run_sketches
+from .parallel_runner import WORKERS
+from .profile_search import CYCLE, profile_route, profile_search
+from .size_sweep import run_sizes, sweep_sizes
+from .strategy_comparison import compare_strategies
+from .sweep_scheduler import run_sweep, sweep_cells
+from .traffic_light_grid import TrafficLightGrid
+from .trajectory_recorder import (
+    TRAJECTORIES_FILE,
+    TrajectoryRecorder,
+    load_trajectories,
+)
+from .vectorized_walk import run_until_precision
+
+STRATEGY_NAMES = [int_to_strategy(strategy) for strategy in STRATEGYS]
+
+# precision asks for 95% confidence intervals this narrow
+RELATIVE_HALF_WIDTH = 0.005
+
+DEPARTURE_WINDOW = 3600  # s
+
+CITY_FILE = "city.bin"
+
+# quantiles prints these
+QUANTILES = [0.5, 0.95, 0.99]
+
+# the grid of sweep
+SWEEP_CITY_SIZES = [7, 20, 50]
+SWEEP_PROBABILITIES_OF_TRAFFIC_LIGHT = [1.0, 0.8, 0.5]
+
+# profile prints the trip for departures this far apart
+DEPARTURE_STEP = 10  # s
+
+
+def _add_config_arguments(
+    parser: argparse.ArgumentParser,
+    city_size: int = SimulationConfig.city_size,
+    probability_of_traffic_light: float = 1.0,
+    number_of_experiments: int = SimulationConfig.number_of_experiments,
+    seed: int = None,
+    engines: list = None,
+    workers: bool = False,
+    strategy: bool = True,
+    experiments: bool = True,
+    seeded: bool = True,
+):
+    # every flag only for the commands that honour it, the config of the
+    # others keeps the default of SimulationConfig; --engine and --workers
+    # are left as None when not given so a command can tell
+    parser.add_argument("--city-size", type=int, default=city_size)
+    parser.add_argument(
+        "--probability", type=float, default=probability_of_traffic_light
+    )
+    if strategy:
+        parser.add_argument("--strategy", choices=STRATEGY_NAMES, default="diagonally")
+    if experiments:
+        parser.add_argument("--experiments", type=int, default=number_of_experiments)
+    if seeded:
+        parser.add_argument("--seed", type=int, default=seed)
+    if engines is not None:
+        parser.add_argument(
+            "--engine", choices=engines, help=f"default {SimulationConfig.engine}"
+        )
+    if workers:
+        parser.add_argument(
+            "--workers", type=int, help=f"default {SimulationConfig.workers}"
+        )
+
+
+def _phase_bins(value: str) -> int:
+    # solve_policy needs bins that start where a green has no longer time
+    phase_bins = int(value)
+    if phase_bins < 2 or phase_bins % 2 != 0:
+        raise argparse.ArgumentTypeError("must be a positive even number")
+    return phase_bins
+
+
+def _config(arguments: argparse.Namespace) -> SimulationConfig:
+    strategy = getattr(arguments, "strategy", None)
+    experiments = getattr(arguments, "experiments", None)
+    engine = getattr(arguments, "engine", None)
+    workers = getattr(arguments, "workers", None)
+    return SimulationConfig(
+        city_size=arguments.city_size,
+        probability_of_traffic_light=arguments.probability,
+        strategy=(
+            SimulationConfig.strategy
+            if strategy is None
+            else strategy_from_name(strategy)
+        ),
+        number_of_experiments=(
+            SimulationConfig.number_of_experiments
+            if experiments is None
+            else experiments
+        ),
+        seed=getattr(arguments, "seed", None),
+        engine=SimulationConfig.engine if engine is None else engine,
+        workers=SimulationConfig.workers if workers is None else workers,
+    )
+
+
+def _print_trip(config: SimulationConfig):
+    end_point = config.end_point
+
+    print("Starting at", START_POINT)
+    print("Going to", end_point)
+
+    horizontal_streets = trip_streets(START_POINT[0], end_point[0])
+    vertical_streets = trip_streets(START_POINT[1], end_point[1])
+
+    horizontal_crossings = trip_crossings(START_POINT[0], end_point[0])
+    vertical_crossings = trip_crossings(START_POINT[1], end_point[1])
+
+    print("Streets to walk:", horizontal_streets + vertical_streets)
+    print("Crossings to cross:", horizontal_crossings + vertical_crossings)
+
+    print()
+
+    meters = horizontal_streets * STREET_LENGTH + vertical_streets * STREET_LENGTH
+
+    print(f"Distance to walk: {meters} meters")
+
+
+def _print_averages(total_time: float, total_waiting_time: float, experiments: int):
+    print(f"Average time: {total_time / experiments / 60} minutes")
+    print(
+        "Average waiting time for traffic lights:",
+        f"{total_waiting_time / experiments / 60} minutes",
+    )
+
+
+def walk_command(arguments: argparse.Namespace):
+    config = _config(arguments)
+    _print_trip(config)
+
+    # the strategy only matters where there are no lights
+    strategies = [config.strategy]
+    if arguments.all_strategies:
+        strategies = STRATEGYS
+
+    for strategy in strategies:
+        print()
+        if arguments.all_strategies:
+            print(f"Strategy: {int_to_strategy(strategy)}")
+        _print_averages(
+            *run(replace(config, strategy=strategy)), config.number_of_experiments
+        )
+
+
+def quantiles_command(arguments: argparse.Namespace):
+    config = _config(arguments)
+    _print_trip(config)
+
+    time_sketch, waiting_time_sketch = run_sketches(config)
+
+    print()
+    for name, sketch in [("Time", time_sketch), ("Waiting time", waiting_time_sketch)]:
+        print(
+            f"{name}:",
+            ", ".join(f"p{q * 100:g} {sketch.quantile(q) / 60:.3f}" for q in QUANTILES),
+            "minutes",
+        )
+
+
+def precision_command(arguments: argparse.Namespace):
+    config = _config(arguments)
+    _print_trip(config)
+
+    time, waiting_time = run_until_precision(config, arguments.relative_half_width)
+
+    print()
+    print(f"Experiments: {time.count}")
+    print(f"Average time: {time.mean / 60} ± {time.half_width() / 60} minutes")
+    print(
+        "Average waiting time for traffic lights:",
+        f"{waiting_time.mean / 60} ± {waiting_time.half_width() / 60} minutes",
+    )
+
+
+def analytic_command(arguments: argparse.Namespace):
+    config = _config(arguments)
+    _print_trip(config)
+
+    expected_time, expected_waiting_time = expected_times(
+        config.city_size, config.probability_of_traffic_light, config.strategy
+    )
+
+    print()
+    print(f"Expected time: {expected_time / 60} minutes")
+    print(
+        "Expected waiting time for traffic lights:",
+        f"{expected_waiting_time / 60} minutes",
+    )
+
+
+def policy_command(arguments: argparse.Namespace):
+    config = _config(arguments)
+    _print_trip(config)
+
+    start = time.perf_counter()
+    policy = solve_policy(
+        config.city_size, config.probability_of_traffic_light, arguments.bins
+    )
+    elapsed = time.perf_counter() - start
+    if arguments.output is not None:
+        policy.save(arguments.output)
+
+    print()
+    print(f"Solved in {elapsed:.3f} s, a table of {policy.nbytes} bytes")
+    expected_time, expected_waiting_time = policy.expected_times()
+    print(f"Optimal policy: {expected_time / 60} minutes")
+    print(
+        "Expected waiting time for traffic lights:",
+        f"{expected_waiting_time / 60} minutes",
+    )
+    for strategy in STRATEGYS:
+        expected_time, _ = expected_times(
+            config.city_size, config.probability_of_traffic_light, strategy
+        )
+        print(f"Strategy {int_to_strategy(strategy)}: {expected_time / 60} minutes")
+
+
+def compare_command(arguments: argparse.Namespace):
+    times, waiting_times, differences = compare_strategies(_config(arguments))
+
+    for strategy in STRATEGYS:
+        print()
+        print(f"Strategy: {int_to_strategy(strategy)}")
+        mean, half_width = times[strategy].mean, times[strategy].half_width()
+        print(f"Average time: {mean / 60} ± {half_width / 60} minutes")
+        mean = waiting_times[strategy].mean
+        half_width = waiting_times[strategy].half_width()
+        print(
+            "Average waiting time for traffic lights:",
+            f"{mean / 60} ± {half_width / 60} minutes",
+        )
+
+    print()
+    for (first, second), difference in differences.items():
+        # what the interval would be had each strategy had its own cities
+        independent = math.hypot(times[first].half_width(), times[second].half_width())
+        print(
+            f"{int_to_strategy(first)} - {int_to_strategy(second)}:",
+            f"{difference.mean / 60} ± {difference.half_width() / 60} minutes",
+            f"(± {independent / 60} with independent cities)",
+        )
+
+
+def sizes_command(arguments: argparse.Namespace):
+    import matplotlib.pyplot as plt
+
+    config = _config(arguments)
+    sizes = range(1, config.city_size + 1)
+    experiments = config.number_of_experiments
+
+    if arguments.nested:
+        if arguments.engine is not None or arguments.workers is not None:
+            arguments.error("--nested walks every size at once, without engines")
+        times, waiting_times = sweep_sizes(config)
+        times = {key: statistics.mean for key, statistics in times.items()}
+        waiting_times = {
+            key: statistics.mean for key, statistics in waiting_times.items()
+        }
+    else:
+        times, waiting_times = run_sizes(config)
+        times = {key: total / experiments for key, total in times.items()}
+        waiting_times = {
+            key: total / experiments for key, total in waiting_times.items()
+        }
+
+    # with lights everywhere the strategies walk the same, plot the total
+    # time instead
+    if config.probability_of_traffic_light >= 1:
+        strategy = STRATEGYS[0]
+        plt.plot(
+            sizes, [times[strategy, size] / 60 for size in sizes], label="Total time"
+        )
+        plt.plot(
+            sizes,
+            [waiting_times[strategy, size] / 60 for size in sizes],
+            label="Waiting time",
+        )
+        plt.ylabel("Time (minutes)")
+    else:
+        for strategy in STRATEGYS:
+            plt.plot(
+                sizes,
+                [waiting_times[strategy, size] / 60 for size in sizes],
+                label=int_to_strategy(strategy),
+            )
+        plt.ylabel("Waiting time (minutes)")
+
+    plt.legend()
+    plt.xlabel("City size")
+    plt.savefig(f"plot - {config.probability_of_traffic_light}.png")
+
+
+def optimal_command(arguments: argparse.Namespace):
+    import matplotlib.pyplot as plt
+
+    config = _config(arguments)
+    sizes = range(1, config.city_size + 1)
+
+    times = {strategy: [] for strategy in STRATEGYS}
+    optimal_times = []
+
+    for city_size in sizes:
+        optimal_time, strategy_times = compare_with_optimal(
+            replace(config, city_size=city_size)
+        )
+        optimal_times.append(optimal_time / 60)
+        for strategy in STRATEGYS:
+            times[strategy].append(strategy_times[strategy] / 60)
+
+    for strategy in STRATEGYS:
+        plt.plot(sizes, times[strategy], label=int_to_strategy(strategy))
+
+    plt.plot(sizes, optimal_times, label="optimal")
+
+    plt.legend()
+    plt.xlabel("City size")
+    plt.ylabel("Time (minutes)")
+    plt.savefig(f"plot - optimal - {config.probability_of_traffic_light}.png")
+
+
+def city_command(arguments: argparse.Namespace):
+    start = time.perf_counter()
+    city = create_square_city_csr(arguments.city_size)
+    city.guardar(arguments.output)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{len(city)} corners and {len(city.destinos)} edges",
+        f"written to {arguments.output} in {elapsed:.2f} s",
+    )
+
+
+def route_command(arguments: argparse.Namespace):
+    config = _config(arguments)
+    traffic_ligths = create_traffic_ligths(
+        config.city_size,
+        config.probability_of_traffic_light,
+        random.Random(config.seed),
+    )
+    city = ImplicitSquareCity(config.city_size)
+    if arguments.city_file is not None:
+        city = GrafoCSR.cargar(arguments.city_file)
+
+    for name, heuristic in [
+        ("dijkstra", None),
+        ("A*", walking_time_heuristic(config.end_point)),
+    ]:
+        start = time.perf_counter()
+        _, arrival_time, waiting_time, expanded = a_star(
+            city, traffic_ligths, START_POINT, config.end_point, heuristic
+        )
+        elapsed = time.perf_counter() - start
+
+        print()
+        print(name)
+        print(f"Time: {arrival_time / 60} minutes")
+        print(f"Waiting time for traffic lights: {waiting_time / 60} minutes")
+        print(
+            f"Expanded {expanded} of {len(city)} corners",
+            f"({expanded / len(city):.1%}) in {elapsed:.3f} s",
+        )
+
+
+def record_command(arguments: argparse.Namespace):
+    config = _config(arguments)
+    recorder = TrajectoryRecorder(config, arguments.output)
+
+    start = time.perf_counter()
+    KERNELS[config.engine](config, recorder=recorder)
+    recorder.flush()
+    elapsed = time.perf_counter() - start
+
+    records = load_trajectories(arguments.output)
+    print(
+        f"{len(records)} experiments of {records.dtype.itemsize} bytes",
+        f"written to {arguments.output} in {elapsed:.2f} s",
+    )
+    print()
+    _print_averages(records["time"].sum(), records["waiting_time"].sum(), len(records))
+    print(f"Average stops: {records['stops'].mean()}")
+
+
+def sweep_command(arguments: argparse.Namespace):
+    config = SimulationConfig(
+        number_of_experiments=arguments.experiments,
+        seed=arguments.seed,
+        engine=arguments.engine,
+    )
+    cells = sweep_cells(
+        config,
+        arguments.sizes,
+        arguments.probabilities,
+        [strategy_from_name(strategy) for strategy in arguments.strategies],
+    )
+    results = run_sweep(cells, arguments.workers, arguments.cache_directory)
+
+    print()
+    for cell in cells:
+        total_time, total_waiting_time = results[cell]
+        print(
+            f"size {cell.city_size:>4} p {cell.probability_of_traffic_light:<4}",
+            f"{int_to_strategy(cell.strategy):>12}:",
+            f"{total_time / cell.number_of_experiments / 60:>10.4f} minutes,",
+            f"{total_waiting_time / cell.number_of_experiments / 60:.4f} waiting",
+        )
+
+
+def crowd_command(arguments: argparse.Namespace):
+    config = _config(arguments)
+    rng = random.Random(config.seed)
+
+    traffic_ligths = create_traffic_ligths(
+        config.city_size, config.probability_of_traffic_light, rng
+    )
+    crowd = CrowdSimulation(traffic_ligths, config.strategy, rng, arguments.lookahead)
+
+    for _ in range(config.number_of_experiments):
+        crowd.add_pedestrian(
+            random_corner(config.city_size, rng),
+            random_corner(config.city_size, rng),
+            rng.random() * arguments.departure_window,
+        )
+
+    start = time.perf_counter()
+    events = crowd.run()
+    elapsed = time.perf_counter() - start
+
+    trip_times = [
+        arrival - departure
+        for arrival, departure in zip(crowd.arrival_times, crowd.departure_times)
+    ]
+
+    print(
+        f"{config.number_of_experiments} pedestrians",
+        f"in a city of size {config.city_size}",
+    )
+    print(
+        f"{events} events and {crowd.heap_operations} heap operations",
+        f"in {elapsed:.2f} s ({events / elapsed:.0f} events/s)",
+    )
+    print()
+    _print_averages(sum(trip_times), sum(crowd.waiting_times), len(trip_times))
+
+
+def trips_command(arguments: argparse.Namespace):
+    config = _config(arguments)
+    rng = np.random.default_rng(config.seed)
+
+    traffic_ligths = TrafficLightGrid.random(
+        1, config.city_size, rng, config.probability_of_traffic_light
+    )
+    origins = random_corners(config.city_size, config.number_of_experiments, rng)
+    destinations = random_corners(config.city_size, config.number_of_experiments, rng)
+    departure_times = (
+        rng.random(config.number_of_experiments) * arguments.departure_window
+    )
+
+    start = time.perf_counter()
+    arrival_times, waiting_times = simulate_trips(
+        traffic_ligths,
+        origins,
+        destinations,
+        departure_times,
+        config.strategy,
+        rng,
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"{config.number_of_experiments} trips in a city of size {config.city_size}")
+    print(f"{elapsed:.2f} s ({config.number_of_experiments / elapsed:.0f} trips/s)")
+    print()
+    _print_averages(
+        (arrival_times - departure_times).sum(),
+        waiting_times.sum(),
+        config.number_of_experiments,
+    )
+
+
+def profile_command(arguments: argparse.Namespace):
+    config = _config(arguments)
+    _print_trip(config)
+
+    traffic_ligths = create_traffic_ligths(
+        config.city_size,
+        config.probability_of_traffic_light,
+        random.Random(config.seed),
+    )
+
+    start = time.perf_counter()
+    profiles = profile_search(
+        ImplicitSquareCity(config.city_size),
+        traffic_ligths,
+        START_POINT,
+        config.end_point,
+    )
+    elapsed = time.perf_counter() - start
+    profile = profiles[config.end_point]
+
+    print()
+    print(f"{len(profile)} pieces in {elapsed:.3f} s")
+
+    departure_time, travel_time = profile.best_departure()
+    print(f"Best departure: {departure_time:.1f} s, {travel_time / 60} minutes")
+    departure_time, travel_time = profile.worst_departure()
+    print(f"Worst departure: {departure_time:.1f} s, {travel_time / 60} minutes")
+
+    print()
+    departure_time = 0
+    while departure_time < CYCLE:
+        route = profile_route(profiles, config.end_point, departure_time)
+        direction = crossing_direction(route[0], route[1])
+        print(
+            f"{departure_time:>6.1f} s:",
+            f"{profile.travel_time(departure_time) / 60:.3f} minutes,",
+            f"first crossing {int_to_direction(direction)}",
+        )
+        departure_time += arguments.step
+
+
+def benchmark_command(arguments: argparse.Namespace):
+    if arguments.case is not None:
+        print(json.dumps(benchmark.measure(json.loads(arguments.case))))
+    elif arguments.counters:
+        benchmark.print_counters(_config(arguments))
+    else:
+        benchmark.run_benchmark(arguments.only, arguments.output)
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pedestrian_walk",
+        description="Pedestrian walks across a city of traffic lights",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("walk", help="average time of the walk")
+    _add_config_arguments(command, engines=list(KERNELS), workers=True)
+    command.add_argument(
+        "--all-strategies", action="store_true", help="one result per strategy"
+    )
+    command.set_defaults(function=walk_command)
+
+    command = commands.add_parser(
+        "quantiles", help="percentiles of the time and of the waiting time"
+    )
+    _add_config_arguments(command, engines=list(SKETCH_KERNELS), workers=True)
+    command.set_defaults(function=quantiles_command)
+
+    command = commands.add_parser(
+        "precision", help="sample until the confidence intervals are narrow enougth"
+    )
+    _add_config_arguments(command, experiments=False)
+    command.add_argument(
+        "--relative-half-width", type=float, default=RELATIVE_HALF_WIDTH
+    )
+    command.set_defaults(function=precision_command)
+
+    command = commands.add_parser("analytic", help="exact expected time")
+    _add_config_arguments(command, experiments=False, seeded=False)
+    command.set_defaults(function=analytic_command)
+
+    command = commands.add_parser(
+        "policy", help="the crossing policy of least expected time"
+    )
+    _add_config_arguments(command, strategy=False, experiments=False, seeded=False)
+    command.add_argument("--bins", type=_phase_bins, default=PHASE_BINS)
+    command.add_argument("--output", help="save the lookup table to this .npz")
+    command.set_defaults(function=policy_command)
+
+    command = commands.add_parser(
+        "compare", help="every strategy on the same random cities"
+    )
+    _add_config_arguments(command, 50, 0.5, 1000, strategy=False)
+    command.set_defaults(function=compare_command)
+
+    command = commands.add_parser(
+        "sizes", help="plot the times of every city size up to --city-size"
+    )
+    _add_config_arguments(
+        command,
+        100,
+        0.8,
+        25,
+        seed=0,
+        engines=list(KERNELS),
+        workers=True,
+        strategy=False,
+    )
+    command.add_argument(
+        "--nested",
+        action="store_true",
+        help="walk every size on the top left corner of the largest city",
+    )
+    command.set_defaults(function=sizes_command, error=command.error)
+
+    command = commands.add_parser(
+        "optimal", help="plot the strategies against the optimal route"
+    )
+    _add_config_arguments(command, 100, 0.8, 25, strategy=False)
+    command.set_defaults(function=optimal_command)
+
+    command = commands.add_parser(
+        "route", help="the optimal route of one city, with and without A*"
+    )
+    _add_config_arguments(command, 100, strategy=False, experiments=False)
+    command.add_argument(
+        "--city-file", help="a square city of --city-size saved by city"
+    )
+    command.set_defaults(function=route_command)
+
+    command = commands.add_parser("city", help="save a square city to a file")
+    command.add_argument("--city-size", type=int, default=SimulationConfig.city_size)
+    command.add_argument("--output", default=CITY_FILE)
+    command.set_defaults(function=city_command)
+
+    command = commands.add_parser(
+        "record", help="write a record of every experiment to a .npy file"
+    )
+    # only these kernels take a recorder
+    _add_config_arguments(command, engines=["scalar", "vectorized"])
+    command.add_argument("--output", default=TRAJECTORIES_FILE)
+    command.set_defaults(function=record_command)
+
+    command = commands.add_parser(
+        "sweep",
+        help="every size, probability and strategy, resumed from the cache",
+    )
+    command.add_argument("--sizes", type=int, nargs="+", default=SWEEP_CITY_SIZES)
+    command.add_argument(
+        "--probabilities",
+        type=float,
+        nargs="+",
+        default=SWEEP_PROBABILITIES_OF_TRAFFIC_LIGHT,
+    )
+    command.add_argument(
+        "--strategies", choices=STRATEGY_NAMES, nargs="+", default=STRATEGY_NAMES
+    )
+    command.add_argument(
+        "--experiments", type=int, default=SimulationConfig.number_of_experiments
+    )
+    command.add_argument("--seed", type=int, default=0)
+    command.add_argument("--engine", choices=list(KERNELS), default="vectorized")
+    command.add_argument("--workers", type=int, default=WORKERS)
+    command.add_argument("--cache-directory", default=CACHE_DIRECTORY)
+    command.set_defaults(function=sweep_command)
+
+    command = commands.add_parser(
+        "crowd", help="pedestrians with random trips sharing one city"
+    )
+    _add_config_arguments(command, 50, 1.0, 100000)
+    command.add_argument("--departure-window", type=float, default=DEPARTURE_WINDOW)
+    command.add_argument(
+        "--lookahead",
+        type=float,
+        default=LOOKAHEAD,
+        help="how far out of time order the events may go, in seconds",
+    )
+    command.set_defaults(function=crowd_command)
+
+    command = commands.add_parser(
+        "trips", help="random trips on one city, vectorized over the trips"
+    )
+    _add_config_arguments(command, 50, 1.0, 100000)
+    command.add_argument("--departure-window", type=float, default=DEPARTURE_WINDOW)
+    command.set_defaults(function=trips_command)
+
+    command = commands.add_parser(
+        "profile", help="the best trip for every departure time of a cycle"
+    )
+    _add_config_arguments(command, strategy=False, experiments=False)
+    command.add_argument("--step", type=float, default=DEPARTURE_STEP)
+    command.set_defaults(function=profile_command)
+
+    command = commands.add_parser("benchmark", help="time the kernels")
+    _add_config_arguments(command, seed=benchmark.SEED)
+    command.add_argument("--output", default=benchmark.BENCHMARK_FILE)
+    command.add_argument("--only", action="append", choices=list(benchmark.ENGINES))
+    command.add_argument(
+        "--counters", action="store_true", help="count the branches instead"
+    )
+    command.add_argument("--case", help=argparse.SUPPRESS)
+    command.set_defaults(function=benchmark_command)
+
+    return parser
+
+
+def main(argv: list = None):
+    arguments = parser().parse_args(argv)
+    arguments.function(arguments)
@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+
+from .city import STRATEGY_DIAGONALLY, STRATEGYS, end_point_of
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    # everything an experiment depends on besides the physical constants of
+    # city.py; kernels take one and return (total_time, total_waiting_time)
+    city_size: int = 7
+    probability_of_traffic_light: float = 1.0
+    strategy: int = STRATEGY_DIAGONALLY
+    number_of_experiments: int = 10000
+    seed: int = None
+    engine: str = "scalar"
+    workers: int = 1
+
+    def __post_init__(self):
+        if self.city_size < 1:
+            raise ValueError("The city needs at least one block")
+        if not 0 <= self.probability_of_traffic_light <= 1:
+            raise ValueError("The probability of traffic light must be in [0, 1]")
+        if self.strategy not in STRATEGYS:
+            raise ValueError(f"Unknown strategy {self.strategy}")
+        if self.number_of_experiments < 1:
+            raise ValueError("At least one experiment is needed")
+        if self.workers < 1:
+            raise ValueError("At least one worker is needed")
+
+    @property
+    def end_point(self) -> tuple:
+        return end_point_of(self.city_size)
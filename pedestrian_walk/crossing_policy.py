@@ -0,0 +1,204 @@
+import numpy as np
+
+from .city import (
+    HORIZONTAL,
+    TRAFFIC_LIGHTS_ALTERNATION_TIME,
+    VERTICAL,
+    TrafficLight,
+    time_to_cross_street,
+    time_to_walk_street,
+)
+
+# the phase of a light is the time since its horizontal green started
+CYCLE = 2 * TRAFFIC_LIGHTS_ALTERNATION_TIME  # s
+
+# bins of a second, an even number so that bins start at the phases where
+# a direction no longer has time to cross, see phase_bin
+PHASE_BINS = 120
+
+
+def phase_of(traffic_light: TrafficLight, current_time: float) -> float:
+    phase = (current_time + traffic_light.initial_time) % CYCLE
+    if traffic_light.initial_green_direction == HORIZONTAL:
+        return phase
+    return (phase + TRAFFIC_LIGHTS_ALTERNATION_TIME) % CYCLE
+
+
+def waiting_time_to_cross(phase: np.ndarray, direction: int) -> np.ndarray:
+    # TrafficLight.waiting_time_to_cross by phase: none while the direction
+    # is green with enougth time to cross, otherwise until its next green
+    if direction == VERTICAL:
+        phase = (phase + TRAFFIC_LIGHTS_ALTERNATION_TIME) % CYCLE
+    return np.where(
+        phase < TRAFFIC_LIGHTS_ALTERNATION_TIME - time_to_cross_street(),
+        0,
+        CYCLE - phase,
+    )
+
+
+def phase_bin(phase: float, phase_bins: int) -> int:
+    # the waits jump when a green has no longer time to cross, so the bins are
+    # shifted to start there and a bin never has both sides of a jump
+    shifted = (phase + time_to_cross_street()) % CYCLE
+    return min(int(shifted * phase_bins / CYCLE), phase_bins - 1)
+
+
+class CrossingPolicy:
+    # the direction to cross by (remaining horizontal crossings, remaining
+    # vertical crossings) and, at a light, the bin of its phase; True is
+    # horizontal; expected_waiting_times has the expected wait of the rest
+    # of the walk from a corner it has just reached
+    def __init__(
+        self,
+        signalized: np.ndarray,
+        unsignalized: np.ndarray,
+        expected_waiting_times: np.ndarray,
+    ):
+        self.signalized = signalized
+        self.unsignalized = unsignalized
+        self.expected_waiting_times = expected_waiting_times
+        self.city_size = len(unsignalized) - 1
+        self.phase_bins = signalized.shape[2]
+
+    def direction(
+        self, remaining_horizontal: int, remaining_vertical: int, phase: float = None
+    ) -> int:
+        # a lookup, phase is None where there is no light
+        if phase is None:
+            horizontal = self.unsignalized[remaining_horizontal, remaining_vertical]
+        else:
+            horizontal = self.signalized[
+                remaining_horizontal,
+                remaining_vertical,
+                phase_bin(phase, self.phase_bins),
+            ]
+        return HORIZONTAL if horizontal else VERTICAL
+
+    def expected_times(self) -> tuple:
+        # from the start of the walk, like analytic_walk.expected_times
+        crossings = self.city_size * 2
+        walking_time = (crossings - 2) * time_to_walk_street() + (
+            crossings * time_to_cross_street()
+        )
+        expected_waiting_time = self.expected_waiting_times[
+            self.city_size, self.city_size
+        ]
+        return walking_time + expected_waiting_time, expected_waiting_time
+
+    @property
+    def nbytes(self) -> int:
+        return self.signalized.nbytes + self.unsignalized.nbytes
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            signalized=self.signalized,
+            unsignalized=self.unsignalized,
+            expected_waiting_times=self.expected_waiting_times,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CrossingPolicy":
+        with np.load(path) as arrays:
+            return cls(
+                arrays["signalized"],
+                arrays["unsignalized"],
+                arrays["expected_waiting_times"],
+            )
+
+
+def _bin_means(function, phase_bins: int) -> np.ndarray:
+    # the mean of function over every phase bin; the waits are linear between
+    # the phases where a green starts or has no longer time to cross, so the
+    # mean of every piece is its value at the middle; these are the values of
+    # the policy the lookup table follows, not of a finer one
+    cross = time_to_cross_street()
+    # shifted, the greens start at cross and T + cross and have no longer
+    # time to cross at 0 and T
+    breaks = np.array([0, TRAFFIC_LIGHTS_ALTERNATION_TIME])
+    breaks = np.concatenate([breaks, breaks + cross])
+    edges = np.union1d(np.linspace(0, CYCLE, phase_bins + 1), breaks)
+    lengths = np.diff(edges)
+    # edges and middles are shifted like in phase_bin
+    middles = edges[:-1] + lengths / 2
+    bins = np.minimum((middles * phase_bins / CYCLE).astype(int), phase_bins - 1)
+    return np.bincount(
+        bins,
+        lengths * function((middles - cross) % CYCLE),
+        minlength=phase_bins,
+    ) / (CYCLE / phase_bins)
+
+
+def solve_policy(
+    city_size: int,
+    probability_of_traffic_light: float = 1,
+    phase_bins: int = PHASE_BINS,
+) -> CrossingPolicy:
+    if phase_bins < 2 or phase_bins % 2 != 0:
+        raise ValueError("The phase bins must be a positive even number")
+    # value iteration for the least expected waiting time, the walking time
+    # is the same for every policy; the lights have independent uniform
+    # offsets, so the phase of a light not seen yet is uniform and the value
+    # of a corner only depends on the crossings left; the last crossing of a
+    # direction leaves the walker at the same light for the other one, with a
+    # phase that is known, which is what the greedy rule ignores; crossings
+    # are only ever used up, so a sweep over the diagonals h + v = k, all the
+    # cells and phase bins of one at a time, reaches the fixed point
+    light = probability_of_traffic_light
+    cross = time_to_cross_street()
+
+    def horizontal_then_vertical(phase: np.ndarray) -> np.ndarray:
+        # with the wait for the other direction at the same light after it
+        wait = waiting_time_to_cross(phase, HORIZONTAL)
+        return wait + waiting_time_to_cross((phase + wait + cross) % CYCLE, VERTICAL)
+
+    def vertical_then_horizontal(phase: np.ndarray) -> np.ndarray:
+        wait = waiting_time_to_cross(phase, VERTICAL)
+        return wait + waiting_time_to_cross((phase + wait + cross) % CYCLE, HORIZONTAL)
+
+    wait_horizontal = _bin_means(
+        lambda phase: waiting_time_to_cross(phase, HORIZONTAL), phase_bins
+    )
+    wait_vertical = _bin_means(
+        lambda phase: waiting_time_to_cross(phase, VERTICAL), phase_bins
+    )
+    wait_then_vertical = _bin_means(horizontal_then_vertical, phase_bins)
+    wait_then_horizontal = _bin_means(vertical_then_horizontal, phase_bins)
+
+    shape = (city_size + 1, city_size + 1)
+    values = np.zeros(shape)
+    signalized = np.zeros(shape + (phase_bins,), dtype=bool)
+    unsignalized = np.zeros(shape, dtype=bool)
+
+    # a single direction left is forced, a light per block
+    remaining = np.arange(city_size + 1)
+    values[0, :] = remaining * light * wait_vertical.mean()
+    values[:, 0] = remaining * light * wait_horizontal.mean()
+    signalized[1:, 0] = True
+    unsignalized[1:, 0] = True
+
+    for k in range(2, city_size * 2 + 1):
+        h = np.arange(max(1, k - city_size), min(city_size, k - 1) + 1)
+        v = k - h
+
+        horizontal = np.where(h > 1, values[h - 1, v], values[0, v - 1])
+        vertical = np.where(v > 1, values[h, v - 1], values[h - 1, 0])
+
+        cost_horizontal = np.where(
+            (h > 1)[:, None],
+            wait_horizontal + horizontal[:, None],
+            wait_then_vertical + values[0, v - 1][:, None],
+        )
+        cost_vertical = np.where(
+            (v > 1)[:, None],
+            wait_vertical + vertical[:, None],
+            wait_then_horizontal + values[h - 1, 0][:, None],
+        )
+
+        signalized[h, v] = cost_horizontal <= cost_vertical
+        unsignalized[h, v] = horizontal <= vertical
+        values[h, v] = light * np.minimum(cost_horizontal, cost_vertical).mean(
+            axis=1
+        ) + (1 - light) * np.minimum(horizontal, vertical)
+
+    return CrossingPolicy(signalized, unsignalized, values)
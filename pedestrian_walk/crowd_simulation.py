@@ -0,0 +1,221 @@
+import heapq
+import math
+import random
+
+from .city import (
+    HORIZONTAL,
+    STRATEGY_DIAGONALLY,
+    STRATEGY_RANDOM,
+    TRAFFIC_LIGHTS_ALTERNATION_TIME,
+    time_to_cross_street,
+    time_to_walk_street,
+)
+from .walk import cross_light, direction_without_light
+
+# how far a pedestrian may run ahead of the rest of the queue, see run(); a
+# light cycle keeps the events of different pedestrians interleaved, at most
+# one cycle out of time order, math.inf only orders the departures
+LOOKAHEAD = 2 * TRAFFIC_LIGHTS_ALTERNATION_TIME  # s
+
+
+def crossings_between(s: int, e: int) -> int:
+    # moves from m to m + 1 or back with an even m are crossings, this counts
+    # the even numbers in [min(s, e), max(s, e) - 1]; also for arrays
+    return abs((e - 1) // 2 - (s - 1) // 2)
+
+
+class _CoinFlips:
+    # the own random choices of a pedestrian for STRATEGY_RANDOM, drawn all
+    # at once when it is added so they do not depend on the order the events
+    # are handled in; a choice per intersection without a light at most
+    __slots__ = ("bits",)
+
+    def __init__(self, rng: random.Random, choices: int):
+        self.bits = rng.getrandbits(choices)
+
+    def choice(self, options: list):
+        option = options[self.bits & 1]
+        self.bits >>= 1
+        return option
+
+
+class CrowdSimulation:
+    # discrete events over many pedestrians sharing one city of traffic
+    # lights; a pedestrian has an event whenever it is free at a corner and
+    # handling it walks the streets ahead, then waits (the wait is computed,
+    # not stepped through) and crosses the light, and schedules the next one;
+    # walks go in any direction with the rules of walk.walk, through its
+    # cross_light and direction_without_light; with STRATEGY_RANDOM every
+    # pedestrian has its own coin flips from rng, so the results are the same
+    # for any lookahead
+    def __init__(
+        self,
+        traffic_ligths: list,
+        strategy: int = STRATEGY_DIAGONALLY,
+        rng: random.Random = random,
+        lookahead: float = LOOKAHEAD,
+    ):
+        self.traffic_ligths = traffic_ligths
+        self.strategy = strategy
+        self.rng = rng
+        self.lookahead = lookahead
+        self.limits = (len(traffic_ligths) * 2, len(traffic_ligths[0]) * 2)
+
+        # flat, indexed by (x // 2) * columns + y // 2
+        self._columns = len(traffic_ligths[0])
+        self._lights = [
+            traffic_light for row in traffic_ligths for traffic_light in row
+        ]
+        self._coin_flips = None
+        if strategy == STRATEGY_RANDOM and None in self._lights:
+            self._coin_flips = []
+
+        self.now = 0
+        self.events = 0
+        self.heap_operations = 0
+        self._queue = []
+
+        self.destinations = []
+        self.departure_times = []
+        self.arrival_times = []
+        self.waiting_times = []
+        # per pedestrian [x, y, step x, step y, remaining streets x, remaining
+        # streets y, remaining crossings x, remaining crossings y]
+        self._states = []
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def position(self, pedestrian: int) -> tuple:
+        return tuple(self._states[pedestrian][:2])
+
+    def add_pedestrian(
+        self, origin: tuple, destination: tuple, departure_time: float = 0
+    ) -> int:
+        for coordinate, limit in zip(origin + destination, self.limits * 2):
+            if not 0 <= coordinate < limit:
+                raise ValueError(f"Corner {origin} or {destination} is out of the city")
+        if departure_time < self.now:
+            raise ValueError("Pedestrians cannot depart in the past")
+
+        steps = [1 if e >= s else -1 for s, e in zip(origin, destination)]
+        crossings = [crossings_between(s, e) for s, e in zip(origin, destination)]
+        streets = [abs(e - s) - c for s, e, c in zip(origin, destination, crossings)]
+
+        pedestrian = len(self._states)
+        self._states.append([*origin, *steps, *streets, *crossings])
+        self.destinations.append(destination)
+        self.departure_times.append(departure_time)
+        self.arrival_times.append(None)
+        self.waiting_times.append(0)
+        if self._coin_flips is not None:
+            self._coin_flips.append(_CoinFlips(self.rng, sum(crossings)))
+
+        heapq.heappush(self._queue, (departure_time, pedestrian))
+        return pedestrian
+
+    def run(self, until: float = math.inf) -> int:
+        # handles every event up to the time until and returns how many; an
+        # event is a pedestrian free at a corner, that walks the streets ahead
+        # and then crosses at the light or arrives; the pedestrians do not
+        # affect each other, so the one on top of the queue keeps going until
+        # it is lookahead seconds past the next one in the queue instead of
+        # being put back after every event, which saves heap work and does not
+        # change any result (a lookahead of 0 handles the events in strict
+        # time order); heap_operations counts the times the queue is touched
+        queue = self._queue
+        lights = self._lights
+        columns = self._columns
+        states = self._states
+        waiting_times = self.waiting_times
+        coin_flips = self._coin_flips
+        strategy = self.strategy
+        lookahead = self.lookahead
+        cross = time_to_cross_street()
+        walk = time_to_walk_street()
+
+        events = 0
+        heap_operations = 0
+        while queue and queue[0][0] <= until:
+            heap_operations += 1
+            current_time, pedestrian = queue[0]
+            state = states[pedestrian]
+            x, y, step_x, step_y, streets_x, streets_y, crossings_x, crossings_y = state
+            waiting_time = waiting_times[pedestrian]
+
+            following = queue[1][0] if len(queue) > 1 else math.inf
+            if len(queue) > 2 and queue[2][0] < following:
+                following = queue[2][0]
+            horizon = min(until, following + lookahead)
+            arrived = False
+
+            while current_time <= horizon:
+                events += 1
+
+                # every street ahead is walked before any crossing, a move
+                # from m to m + 1 or back with an odd m is a street
+                if streets_x and (x if step_x > 0 else x - 1) & 1:
+                    current_time += walk
+                    x += step_x
+                    streets_x -= 1
+                if streets_y and (y if step_y > 0 else y - 1) & 1:
+                    current_time += walk
+                    y += step_y
+                    streets_y -= 1
+
+                if not (crossings_x or crossings_y):
+                    arrived = True
+                    break
+
+                traffic_light = lights[(x // 2) * columns + y // 2]
+                if traffic_light is None:
+                    direction = direction_without_light(
+                        strategy,
+                        crossings_x,
+                        crossings_y,
+                        None if coin_flips is None else coin_flips[pedestrian],
+                    )
+                else:
+                    direction, wait_for_time, wait_for_change = cross_light(
+                        traffic_light, current_time, (crossings_x, crossings_y)
+                    )
+                    current_time += wait_for_time
+                    current_time += wait_for_change
+                    waiting_time += wait_for_time
+                    waiting_time += wait_for_change
+
+                current_time += cross
+                if direction == HORIZONTAL:
+                    x += step_x
+                    crossings_x -= 1
+                else:
+                    y += step_y
+                    crossings_y -= 1
+
+            state[:] = (
+                x,
+                y,
+                step_x,
+                step_y,
+                streets_x,
+                streets_y,
+                crossings_x,
+                crossings_y,
+            )
+            waiting_times[pedestrian] = waiting_time
+
+            if arrived:
+                heapq.heappop(queue)
+                self.arrival_times[pedestrian] = current_time
+            else:
+                heapq.heapreplace(queue, (current_time, pedestrian))
+
+        self.events += events
+        self.heap_operations += heap_operations
+        if until != math.inf:
+            self.now = max(self.now, until)
+        return events
+
+
+def random_corner(city_size: int, rng: random.Random) -> tuple:
+    return (rng.randrange(city_size * 2), rng.randrange(city_size * 2))
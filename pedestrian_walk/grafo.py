@@ -0,0 +1,519 @@
+import itertools
+import os
+import random
+import struct
+import tempfile
+
+import numpy as np
+
+# archivo de GrafoCSR.guardar: la cabecera (magia, es_dirigido, clase de
+# vertices, bytes de una coordenada, bytes de un destino, cantidad de
+# vertices, de aristas y de coordenadas por vertice), la forma de la grilla si
+# la hay y despues los arreglos, cada uno alineado a _ALINEACION bytes para
+# poder mapearlos en memoria
+_MAGIA = b"PWG1"
+_CABECERA = struct.Struct("<4s?BBBQQQ")
+_ALINEACION = 64
+_GRILLA = 0
+_ENTEROS = 1
+
+
+class Grafo:
+    def __init__(self, es_dirigido=False, lista_vertices=[]):
+        self.es_dirigido = es_dirigido
+        self.adyacencias = {}
+        self.data = {}
+        for v in lista_vertices:
+            self.adyacencias[v] = {}
+            self.data[v] = None
+
+    def __contains__(self, v):
+        return v in self.adyacencias
+
+    def __setitem__(self, v, data):
+        vecinos = self.adyacencias[v] if v in self else {}
+        self.adyacencias[v] = vecinos
+        self.data[v] = data
+
+    def _validar_vertice(self, v):
+        if v not in self:
+            raise IndexError("Vertice " + v + " no esta en el grafo")
+
+    def __getitem__(self, v):
+        self._validar_vertice(v)
+        return self.data[v]
+
+    def arista(self, v, w, peso=1):
+        self._validar_vertice(v)
+        self._validar_vertice(w)
+        self.adyacencias[v][w] = peso
+        if not self.es_dirigido:
+            self.adyacencias[w][v] = peso
+
+    def eliminar_arista(self, v, w):
+        self._validar_vertice(v)
+        self._validar_vertice(w)
+        del self.adyacencias[v][w]
+        if not self.es_dirigido:
+            del self.adyacencias[w][v]
+
+    def hay_arista(self, v, w):
+        self._validar_vertice(v)
+        self._validar_vertice(w)
+        return w in self.adyacencias[v]
+
+    def peso_arista(self, v, w):
+        if not self.hay_arista(v, w):
+            raise ValueError("Los vertices " + v + " y " + w + " no estan unidos")
+        return self.adyacencias[v][w]
+
+    def keys(self):
+        return list(self.adyacencias.keys())
+
+    def random(self):
+        return random.choice(self.keys())
+
+    def adyacentes(self, v):
+        return list(self.adyacencias[v].keys())
+
+    def adyacentes_con_peso(self, v):
+        return list(self.adyacencias[v].items())
+
+    def __iter__(self):
+        return iter(self.adyacencias)
+
+    def __repr__(self):
+        cadena = "{\n"
+        for v in self:
+            cadena += "\t" + str(v) + ": ["
+            adyacentes = self.adyacentes(v)
+            i = 1
+            for w in adyacentes:
+                cadena += str(w) + ("" if i == len(adyacentes) else ", ")
+                i += 1
+            cadena += "]\n"
+        cadena += "}"
+        return cadena
+
+    def __str__(self):
+        return repr(self)
+
+    def __len__(self):
+        return len(self.adyacencias)
+
+    def guardar(self, ruta):
+        GrafoCSR.desde_grafo(self).guardar(ruta)
+
+
+class _VerticesGenericos:
+    # cualquier vertice hasheable, con una lista y un diccionario
+    def __init__(self, vertices):
+        self.vertices = list(vertices)
+        self.indices = {v: i for i, v in enumerate(self.vertices)}
+
+    def __contains__(self, v):
+        return v in self.indices
+
+    def indice(self, v):
+        if v not in self.indices:
+            raise IndexError("Vertice " + str(v) + " no esta en el grafo")
+        return self.indices[v]
+
+    def vertice(self, i):
+        return self.vertices[i]
+
+    def muchos_vertices(self, indices):
+        return [self.vertices[i] for i in indices]
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def __iter__(self):
+        return iter(self.vertices)
+
+
+class _VerticesEnteros:
+    # vertices que son tuplas de enteros (como las esquinas de la ciudad),
+    # guardados ordenados en un arreglo estructurado sin un objeto por vertice
+    def __init__(self, vertices):
+        vertices = sorted(vertices)
+        largo = len(vertices[0]) if vertices else 0
+        valores = np.array(vertices, dtype=np.int64).reshape(len(vertices), largo)
+        tipo = (
+            np.int32
+            if valores.size == 0
+            or (
+                valores.min() >= np.iinfo(np.int32).min
+                and valores.max() <= np.iinfo(np.int32).max
+            )
+            else np.int64
+        )
+        self.dtype = np.dtype([(f"c{k}", tipo) for k in range(largo)])
+        self.vertices = np.empty(len(vertices), dtype=self.dtype)
+        for k in range(largo):
+            self.vertices[f"c{k}"] = valores[:, k]
+
+    @classmethod
+    def desde_arreglo(cls, vertices):
+        # vertices ya ordenados en un arreglo estructurado, sin copiarlos
+        enteros = cls.__new__(cls)
+        enteros.dtype = vertices.dtype
+        enteros.vertices = vertices
+        return enteros
+
+    @staticmethod
+    def aceptan(vertices):
+        largos = set()
+        for v in vertices:
+            if not isinstance(v, tuple) or not all(
+                isinstance(c, (int, np.integer)) for c in v
+            ):
+                return False
+            largos.add(len(v))
+        return len(largos) == 1
+
+    def _buscar(self, v):
+        if not isinstance(v, tuple) or len(v) != len(self.dtype):
+            return -1
+        try:
+            clave = np.array(v, dtype=self.dtype)
+        except (OverflowError, TypeError, ValueError):
+            return -1
+        i = int(np.searchsorted(self.vertices, clave))
+        return i if i < len(self.vertices) and self.vertices[i] == clave else -1
+
+    def __contains__(self, v):
+        return self._buscar(v) >= 0
+
+    def indice(self, v):
+        i = self._buscar(v)
+        if i < 0:
+            raise IndexError("Vertice " + str(v) + " no esta en el grafo")
+        return i
+
+    def muchos_indices(self, coordenadas):
+        # los indices de un arreglo (n, largo) de vertices, buscados de una vez
+        claves = np.empty(len(coordenadas), dtype=self.dtype)
+        for k in range(len(self.dtype)):
+            claves[f"c{k}"] = coordenadas[:, k]
+        indices = np.searchsorted(self.vertices, claves)
+        encontrados = indices < len(self.vertices)
+        encontrados[encontrados] = (
+            self.vertices[indices[encontrados]] == claves[encontrados]
+        )
+        if not encontrados.all():
+            v = tuple(coordenadas[np.argmin(encontrados)].tolist())
+            raise IndexError("Vertice " + str(v) + " no esta en el grafo")
+        return indices
+
+    def vertice(self, i):
+        return tuple(int(c) for c in self.vertices[i])
+
+    def muchos_vertices(self, indices):
+        return self.vertices[indices].tolist()
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def __iter__(self):
+        return iter(self.muchos_vertices(np.arange(len(self.vertices))))
+
+
+class _VerticesGrilla:
+    # todas las tuplas de enteros de una caja, 0 <= v[k] < forma[k], numeradas
+    # en orden lexicografico con aritmetica y sin guardar ningun vertice
+    def __init__(self, forma):
+        self.forma = tuple(forma)
+
+    def __contains__(self, v):
+        return (
+            isinstance(v, tuple)
+            and len(v) == len(self.forma)
+            and all(
+                isinstance(c, (int, np.integer)) and 0 <= c < largo
+                for c, largo in zip(v, self.forma)
+            )
+        )
+
+    def indice(self, v):
+        if v not in self:
+            raise IndexError("Vertice " + str(v) + " no esta en el grafo")
+        return int(np.ravel_multi_index(v, self.forma))
+
+    def muchos_indices(self, coordenadas):
+        try:
+            return np.ravel_multi_index(coordenadas.T, self.forma)
+        except ValueError:
+            afuera = ((coordenadas < 0) | (coordenadas >= self.forma)).any(axis=1)
+            v = tuple(coordenadas[np.argmax(afuera)].tolist())
+            raise IndexError("Vertice " + str(v) + " no esta en el grafo") from None
+
+    def vertice(self, i):
+        return tuple(int(c) for c in np.unravel_index(i, self.forma))
+
+    def muchos_vertices(self, indices):
+        return list(zip(*(c.tolist() for c in np.unravel_index(indices, self.forma))))
+
+    def __len__(self):
+        return int(np.prod(self.forma))
+
+    def __iter__(self):
+        return itertools.product(*(range(largo) for largo in self.forma))
+
+
+class GrafoCSR:
+    # version inmutable y compacta de Grafo: los vertices se traducen a
+    # indices enteros y las aristas de cada vertice quedan contiguas en
+    # destinos[inicios[i]:inicios[i + 1]] con sus pesos al lado
+    def __init__(self, vertices, inicios, destinos, pesos, es_dirigido=False):
+        self.es_dirigido = es_dirigido
+        self._vertices = vertices
+        self.inicios = inicios
+        self.destinos = destinos
+        self.pesos = pesos
+
+    @classmethod
+    def desde_grafo(cls, grafo):
+        if _VerticesEnteros.aceptan(grafo):
+            vertices = _VerticesEnteros(grafo)
+        else:
+            vertices = _VerticesGenericos(grafo)
+
+        inicios = np.zeros(len(vertices) + 1, dtype=np.int64)
+        destinos = []
+        pesos = []
+        for i, v in enumerate(vertices):
+            adyacentes = sorted(
+                (vertices.indice(w), peso) for w, peso in grafo.adyacentes_con_peso(v)
+            )
+            destinos.extend(w for w, _ in adyacentes)
+            pesos.extend(peso for _, peso in adyacentes)
+            inicios[i + 1] = len(destinos)
+
+        tipo = np.int32 if len(vertices) <= np.iinfo(np.int32).max else np.int64
+        return cls(
+            vertices,
+            inicios,
+            np.array(destinos, dtype=tipo),
+            np.array(pesos, dtype=np.float64),
+            grafo.es_dirigido,
+        )
+
+    @classmethod
+    def desde_aristas(cls, origenes, destinos, pesos, es_dirigido=False, forma=None):
+        # carga de una vez las aristas de arreglos (n, largo) de vertices
+        # enteros y sus pesos, sin pasar por Grafo; con forma los vertices son
+        # toda la caja de _VerticesGrilla, sin forma los extremos de las
+        # aristas; como en Grafo.arista, una arista repetida queda con el
+        # ultimo peso
+        origenes = np.asarray(origenes)
+        destinos = np.asarray(destinos)
+        pesos = np.asarray(pesos, dtype=np.float64)
+        if not len(origenes) == len(destinos) == len(pesos):
+            raise ValueError("Las aristas necesitan un origen, un destino y un peso")
+
+        if forma is not None:
+            vertices = _VerticesGrilla(forma)
+        else:
+            extremos = np.unique(np.concatenate([origenes, destinos]), axis=0)
+            vertices = _VerticesEnteros(list(map(tuple, extremos.tolist())))
+
+        desde = vertices.muchos_indices(origenes)
+        hasta = vertices.muchos_indices(destinos)
+        if not es_dirigido:
+            # cada arista seguida de su vuelta, asi el orden estable respeta
+            # el orden de las aristas tambien entre sentidos opuestos
+            desde, hasta = (
+                np.column_stack([desde, hasta]).ravel(),
+                np.column_stack([hasta, desde]).ravel(),
+            )
+            pesos = np.repeat(pesos, 2)
+
+        # ordenadas por origen y destino con un orden estable, de cada
+        # repetida queda la ultima
+        clave = desde * len(vertices) + hasta
+        if not (clave[1:] >= clave[:-1]).all():
+            orden = np.argsort(clave, kind="stable")
+            clave, desde, hasta = clave[orden], desde[orden], hasta[orden]
+            pesos = pesos[orden]
+        ultimas = np.ones(len(clave), dtype=bool)
+        ultimas[:-1] = clave[1:] != clave[:-1]
+        if not ultimas.all():
+            desde, hasta, pesos = desde[ultimas], hasta[ultimas], pesos[ultimas]
+
+        inicios = np.zeros(len(vertices) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(desde, minlength=len(vertices)), out=inicios[1:])
+
+        tipo = np.int32 if len(vertices) <= np.iinfo(np.int32).max else np.int64
+        return cls(vertices, inicios, hasta.astype(tipo), pesos, es_dirigido)
+
+    def guardar(self, ruta):
+        # se escribe en un temporal y se renombra, nadie ve un archivo a medias
+        arreglos = [self.inicios, self.destinos, self.pesos]
+        if isinstance(self._vertices, _VerticesGrilla):
+            clase = _GRILLA
+            forma = np.array(self._vertices.forma, dtype=np.int64)
+            bytes_coordenada = forma.itemsize
+        elif isinstance(self._vertices, _VerticesEnteros):
+            clase = _ENTEROS
+            forma = np.zeros(0, dtype=np.int64)
+            bytes_coordenada = self._vertices.dtype[0].itemsize
+            arreglos.append(self._vertices.vertices)
+        else:
+            raise ValueError("Solo se pueden guardar grafos de vertices enteros")
+
+        cabecera = _CABECERA.pack(
+            _MAGIA,
+            self.es_dirigido,
+            clase,
+            bytes_coordenada,
+            self.destinos.itemsize,
+            len(self),
+            len(self.destinos),
+            len(forma) if clase == _GRILLA else len(self._vertices.dtype),
+        )
+
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        descriptor, ruta_temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as archivo:
+                archivo.write(cabecera)
+                archivo.write(forma.tobytes())
+                for arreglo in arreglos:
+                    archivo.write(b"\0" * (-archivo.tell() % _ALINEACION))
+                    archivo.write(np.ascontiguousarray(arreglo).tobytes())
+            os.replace(ruta_temporal, ruta)
+        except BaseException:
+            os.unlink(ruta_temporal)
+            raise
+
+    @classmethod
+    def cargar(cls, ruta):
+        # los arreglos quedan mapeados en memoria de solo lectura, varios
+        # procesos que cargan el mismo archivo comparten sus paginas
+        with open(ruta, "rb") as archivo:
+            contenido = archivo.read(_CABECERA.size)
+            if len(contenido) < _CABECERA.size:
+                raise ValueError("El archivo " + str(ruta) + " no es un grafo")
+            (
+                magia,
+                es_dirigido,
+                clase,
+                bytes_coordenada,
+                bytes_destino,
+                cantidad_vertices,
+                cantidad_aristas,
+                dimensiones,
+            ) = _CABECERA.unpack(contenido)
+            if magia != _MAGIA:
+                raise ValueError("El archivo " + str(ruta) + " no es un grafo")
+            if clase == _GRILLA:
+                forma = np.frombuffer(archivo.read(8 * dimensiones), dtype=np.int64)
+            posicion = archivo.tell()
+
+        def mapear(dtype, largo):
+            nonlocal posicion
+            posicion += -posicion % _ALINEACION
+            if largo == 0:
+                arreglo = np.zeros(0, dtype=dtype)
+            else:
+                arreglo = np.memmap(
+                    ruta, dtype=dtype, mode="r", offset=posicion, shape=(largo,)
+                )
+            posicion += np.dtype(dtype).itemsize * largo
+            return arreglo
+
+        inicios = mapear(np.int64, cantidad_vertices + 1)
+        destinos = mapear(np.dtype(f"<i{bytes_destino}"), cantidad_aristas)
+        pesos = mapear(np.float64, cantidad_aristas)
+        if clase == _GRILLA:
+            vertices = _VerticesGrilla(forma.tolist())
+        else:
+            tipo = np.dtype(f"<i{bytes_coordenada}")
+            vertices = _VerticesEnteros.desde_arreglo(
+                mapear(
+                    np.dtype([(f"c{k}", tipo) for k in range(dimensiones)]),
+                    cantidad_vertices,
+                )
+            )
+        return cls(vertices, inicios, destinos, pesos, es_dirigido)
+
+    def __contains__(self, v):
+        return v in self._vertices
+
+    def indice(self, v):
+        return self._vertices.indice(v)
+
+    def vertice(self, i):
+        return self._vertices.vertice(i)
+
+    def vecinos(self, i):
+        inicio, fin = self.inicios[i], self.inicios[i + 1]
+        return self.destinos[inicio:fin], self.pesos[inicio:fin]
+
+    def adyacentes_por_indice(self, i):
+        # (indice, vertice, peso) de cada vecino, sin buscar ningun vertice
+        destinos, pesos = self.vecinos(i)
+        return zip(
+            destinos.tolist(),
+            self._vertices.muchos_vertices(destinos),
+            pesos.tolist(),
+        )
+
+    def _posicion_arista(self, v, w):
+        destinos, _ = self.vecinos(self.indice(v))
+        j = self.indice(w)
+        k = int(np.searchsorted(destinos, j))
+        return k if k < len(destinos) and destinos[k] == j else -1
+
+    def hay_arista(self, v, w):
+        return self._posicion_arista(v, w) >= 0
+
+    def peso_arista(self, v, w):
+        k = self._posicion_arista(v, w)
+        if k < 0:
+            raise ValueError(
+                "Los vertices " + str(v) + " y " + str(w) + " no estan unidos"
+            )
+        return float(self.pesos[self.inicios[self.indice(v)] + k])
+
+    def keys(self):
+        return list(self._vertices)
+
+    def random(self):
+        return self.vertice(random.randrange(len(self)))
+
+    def adyacentes(self, v):
+        destinos, _ = self.vecinos(self.indice(v))
+        return self._vertices.muchos_vertices(destinos)
+
+    def adyacentes_con_peso(self, v):
+        destinos, pesos = self.vecinos(self.indice(v))
+        return list(zip(self._vertices.muchos_vertices(destinos), pesos.tolist()))
+
+    def __iter__(self):
+        return iter(self._vertices)
+
+    def __repr__(self):
+        cadena = "{\n"
+        for v in self:
+            cadena += "\t" + str(v) + ": ["
+            cadena += ", ".join(str(w) for w in self.adyacentes(v))
+            cadena += "]\n"
+        cadena += "}"
+        return cadena
+
+    def __str__(self):
+        return repr(self)
+
+    def __len__(self):
+        return len(self._vertices)
+
+    @property
+    def nbytes(self):
+        return (
+            self.inicios.nbytes
+            + self.destinos.nbytes
+            + self.pesos.nbytes
+            + getattr(getattr(self._vertices, "vertices", None), "nbytes", 0)
+        )
@@ -0,0 +1,131 @@
+import numpy as np
+
+from .city import TRAFFIC_LIGHTS_ALTERNATION_TIME
+from .config import SimulationConfig
+from .vectorized_walk import BATCH_SIZE, simulate_walks
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_PRESENCE_KEY = np.uint64(0xD1B54A32D192ED03)
+
+# doubles have 53 bits of mantissa
+_MANTISSA_BITS = np.uint64(53)
+_UNIT = 2.0**-53
+
+
+def splitmix64(x: np.ndarray) -> np.ndarray:
+    # finalizer of splitmix64, consecutive inputs give unrelated outputs; the
+    # arithmetic is modulo 2**64 on purpose
+    with np.errstate(over="ignore"):
+        z = np.asarray(x, dtype=np.uint64) + _GOLDEN_GAMMA
+        z = (z ^ (z >> np.uint64(30))) * _MIX_1
+        z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+
+def _to_unit_interval(bits: np.ndarray) -> np.ndarray:
+    return (bits >> (np.uint64(64) - _MANTISSA_BITS)).astype(np.float64) * _UNIT
+
+
+class HashedTrafficLights:
+    # lights of number_of_experiments cities that are never stored: every
+    # light is a hash of (seed, experiment, i, j), so only the lights the
+    # walkers reach are computed and an experiment always gets the same city
+    # no matter the batch it runs in; same interface as TrafficLightGrid
+    def __init__(
+        self,
+        number_of_experiments: int,
+        city_size: int,
+        seed: int = None,
+        probability_of_traffic_light: float = 1,
+        first_experiment: int = 0,
+    ):
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.seed = seed & 0xFFFFFFFFFFFFFFFF
+        self.number_of_experiments = number_of_experiments
+        self.city_size = city_size
+        self.probability_of_traffic_light = probability_of_traffic_light
+        self.first_experiment = first_experiment
+        self._key = splitmix64(np.uint64(self.seed))
+
+    @property
+    def has_missing_lights(self) -> bool:
+        return self.probability_of_traffic_light < 1
+
+    @property
+    def columns(self) -> int:
+        return self.city_size
+
+    @property
+    def nbytes(self) -> int:
+        return 0
+
+    def __len__(self) -> int:
+        return self.number_of_experiments
+
+    def __getitem__(self, experiments: slice) -> "HashedTrafficLights":
+        start, stop, step = experiments.indices(self.number_of_experiments)
+        if step != 1:
+            raise ValueError("Only contiguous experiments can be taken")
+        return HashedTrafficLights(
+            max(0, stop - start),
+            self.city_size,
+            self.seed,
+            self.probability_of_traffic_light,
+            self.first_experiment + start,
+        )
+
+    def light_index(
+        self, experiment: np.ndarray, i: np.ndarray, j: np.ndarray
+    ) -> np.ndarray:
+        # global over the experiments, so it names the same light in any batch
+        experiment = np.asarray(experiment, dtype=np.int64) + self.first_experiment
+        return (experiment * self.city_size + i) * self.city_size + j
+
+    def _bits(self, index: np.ndarray) -> np.ndarray:
+        return splitmix64(np.asarray(index).astype(np.uint64) ^ self._key)
+
+    def lights_at(self, index: np.ndarray) -> tuple:
+        bits = self._bits(index)
+        # lowest bit for the direction, the highest ones for the offset
+        initial_green_direction = (bits & np.uint64(1)).astype(np.int8)
+        initial_time = _to_unit_interval(bits) * TRAFFIC_LIGHTS_ALTERNATION_TIME
+        return initial_green_direction, initial_time
+
+    def is_present_at(self, index: np.ndarray) -> np.ndarray:
+        if not self.has_missing_lights:
+            return np.ones(np.shape(index), dtype=bool)
+        presence = _to_unit_interval(splitmix64(self._bits(index) ^ _PRESENCE_KEY))
+        return presence < self.probability_of_traffic_light
+
+    def lights(self, experiment: np.ndarray, i: np.ndarray, j: np.ndarray) -> tuple:
+        return self.lights_at(self.light_index(experiment, i, j))
+
+    def is_present(
+        self, experiment: np.ndarray, i: np.ndarray, j: np.ndarray
+    ) -> np.ndarray:
+        return self.is_present_at(self.light_index(experiment, i, j))
+
+
+def run_experiments(config: SimulationConfig) -> tuple:
+    traffic_ligths = HashedTrafficLights(
+        config.number_of_experiments,
+        config.city_size,
+        config.seed,
+        config.probability_of_traffic_light,
+    )
+    rng = np.random.default_rng(config.seed)
+
+    total_time = 0
+    total_waiting_time = 0
+
+    for start in range(0, config.number_of_experiments, BATCH_SIZE):
+        times, waiting_times = simulate_walks(
+            traffic_ligths[start : start + BATCH_SIZE], config.strategy, rng
+        )
+        total_time += times.sum()
+        total_waiting_time += waiting_times.sum()
+
+    return total_time, total_waiting_time
@@ -0,0 +1,56 @@
+from . import analytic_walk, hashed_traffic_lights, vectorized_walk, walk
+from .config import SimulationConfig
+from .parallel_runner import run_parallel, run_shards
+from .quantile_sketch import QuantileSketch
+
+# a kernel takes a SimulationConfig and returns (total_time,
+# total_waiting_time) over its experiments
+KERNELS = {
+    "scalar": walk.run_experiments,
+    "vectorized": vectorized_walk.run_experiments,
+    "hashed": hashed_traffic_lights.run_experiments,
+    "analytic": analytic_walk.run_experiments,
+    "policy": walk.run_policy_experiments,
+}
+
+# the kernels that feed every experiment to a pair of sketches
+SKETCH_KERNELS = {
+    "scalar": walk.run_experiments,
+    "vectorized": vectorized_walk.run_experiments,
+}
+
+
+def kernel_of(config: SimulationConfig):
+    if config.engine not in KERNELS:
+        raise ValueError(f"Unknown engine {config.engine}")
+    return KERNELS[config.engine]
+
+
+def run(config: SimulationConfig) -> tuple:
+    kernel = kernel_of(config)
+    if config.workers > 1:
+        return run_parallel(kernel, config)
+    return kernel(config)
+
+
+def sketch_shard(config: SimulationConfig) -> tuple:
+    if config.engine not in SKETCH_KERNELS:
+        raise ValueError(f"The {config.engine} engine does not feed sketches")
+    sketches = (QuantileSketch(), QuantileSketch())
+    SKETCH_KERNELS[config.engine](config, sketches=sketches)
+    return sketches
+
+
+def run_sketches(config: SimulationConfig) -> tuple:
+    # the QuantileSketch of the time and of the waiting time, the shards of a
+    # parallel run merge exactly
+    if config.workers == 1:
+        return sketch_shard(config)
+
+    time_sketch, waiting_time_sketch = QuantileSketch(), QuantileSketch()
+    for shard_time_sketch, shard_waiting_time_sketch in run_shards(
+        sketch_shard, config
+    ):
+        time_sketch.merge(shard_time_sketch)
+        waiting_time_sketch.merge(shard_waiting_time_sketch)
+    return time_sketch, waiting_time_sketch
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+
+import numpy as np
+
+from .config import SimulationConfig
+
+WORKERS = os.cpu_count()
+
+
+def shard_sizes(number_of_experiments: int, shards: int) -> list:
+    size, extra = divmod(number_of_experiments, shards)
+    return [size + (shard < extra) for shard in range(shards)]
+
+
+def shard_seeds(seed: int, shards: int) -> list:
+    # independent streams: every shard gets its own child of the seed sequence
+    return [
+        int(child.generate_state(1, np.uint64)[0])
+        for child in np.random.SeedSequence(seed).spawn(shards)
+    ]
+
+
+def shard_configs(config: SimulationConfig, shards: int) -> list:
+    # a config without seed gets fresh entropy, like a single worker does
+    seed = np.random.SeedSequence().entropy if config.seed is None else config.seed
+    # with more shards than experiments the last ones are empty and left out
+    return [
+        replace(config, number_of_experiments=size, seed=shard_seed, workers=1)
+        for size, shard_seed in zip(
+            shard_sizes(config.number_of_experiments, shards),
+            shard_seeds(seed, shards),
+        )
+        if size > 0
+    ]
+
+
+def run_shard(kernel, config: SimulationConfig, shards: int, shard: int) -> tuple:
+    # runs a single shard, so a sweep can also be split across machines,
+    # which needs a seed for the shards to be independent
+    return kernel(shard_configs(config, shards)[shard])
+
+
+def run_shards(function, config: SimulationConfig, workers: int = None) -> list:
+    # function(shard_config) of every shard on a process pool, the results in
+    # shard order; it must be a module level function so the pool can pickle
+    # it
+    workers = config.workers if workers is None else workers
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(function, shard) for shard in shard_configs(config, workers)
+        ]
+        return [future.result() for future in futures]
+
+
+def run_parallel(kernel, config: SimulationConfig, workers: int = None) -> tuple:
+    # the kernel runs as kernel(config) and returns (total_time,
+    # total_waiting_time)
+    results = run_shards(kernel, config, workers)
+
+    # summed in shard order, so a seed and a number of workers always give
+    # the same bits no matter which shard finishes first
+    total_time = 0
+    total_waiting_time = 0
+    for shard_time, shard_waiting_time in results:
+        total_time += shard_time
+        total_waiting_time += shard_waiting_time
+
+    return total_time, total_waiting_time
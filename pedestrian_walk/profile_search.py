@@ -0,0 +1,279 @@
+import bisect
+import heapq
+import math
+
+from .city import (
+    TRAFFIC_LIGHTS_ALTERNATION_TIME,
+    TrafficLight,
+    time_to_cross_street,
+    traffic_ligth_from_position,
+)
+from .city_as_graph import crossing_direction, search_space
+from .grafo import Grafo
+
+# every light repeats itself after a horizontal and a vertical green, so the
+# arrival at any corner as a function of the departure time does too
+CYCLE = 2 * TRAFFIC_LIGHTS_ALTERNATION_TIME  # s
+
+# pieces closer than this are the same, so rounding can not keep a search going
+EPSILON = 1e-9
+
+
+class ArrivalProfile:
+    # arrival time as a function of the departure time from the origin over
+    # one cycle: pieces (lo, hi, a, b, parent) sorted and covering [0, CYCLE),
+    # leaving at lo <= t < hi arrives at a + b * t and comes from the corner
+    # parent (None at the origin); b is 1 while the route has not waited yet
+    # and 0 once a light holds it, so there are jumps but it never decreases
+    def __init__(self, pieces: list):
+        self.pieces = pieces
+        self._los = [piece[0] for piece in pieces]
+
+    def __len__(self) -> int:
+        return len(self.pieces)
+
+    def _piece(self, departure_time: float) -> tuple:
+        cycles, departure_time = divmod(departure_time, CYCLE)
+        piece = self.pieces[bisect.bisect_right(self._los, departure_time) - 1]
+        return piece, departure_time, cycles * CYCLE
+
+    def arrival_time(self, departure_time: float) -> float:
+        (_, _, a, b, _), departure_time, offset = self._piece(departure_time)
+        return a + b * departure_time + offset
+
+    def travel_time(self, departure_time: float) -> float:
+        return self.arrival_time(departure_time) - departure_time
+
+    def parent(self, departure_time: float) -> tuple:
+        return self._piece(departure_time)[0][4]
+
+    def _departures(self):
+        # the start of every piece wider than EPSILON with its travel time
+        return (
+            (lo, self.travel_time(lo))
+            for lo, hi, _, _, _ in self.pieces
+            if hi - lo > EPSILON
+        )
+
+    def best_departure(self) -> tuple:
+        # a trip is shortest when it leaves just as a piece starts: later in a
+        # piece of slope 1 it takes the same, and a piece of slope 0 ends
+        # where the next one starts
+        return min(self._departures(), key=lambda departure: departure[1])
+
+    def worst_departure(self) -> tuple:
+        return max(self._departures(), key=lambda departure: departure[1])
+
+    def is_fifo(self) -> bool:
+        # leaving later never arrives earlier: no piece starts below where
+        # the one before it ends, including the first one of the next cycle
+        ends = [(a + b * lo, a + b * hi) for lo, hi, a, b, _ in self.pieces]
+        ends.append((ends[0][0] + CYCLE, None))
+        return all(
+            start >= end - EPSILON for (_, end), (start, _) in zip(ends, ends[1:])
+        )
+
+
+def _earliest(pieces: list) -> float:
+    return min(a + b * lo for lo, _, a, b, _ in pieces)
+
+
+def _latest(pieces: list) -> float:
+    return max(a + b * hi for _, hi, a, b, _ in pieces)
+
+
+def _append(pieces: list, piece: tuple):
+    # pieces no wider than EPSILON come from rounding where two limits are
+    # the same, they are left to the piece before them (or the first piece
+    # to the one after it) instead of carrying an arrival of their own;
+    # consecutive pieces of the same line are joined
+    lo, hi, a, b, parent = piece
+    if pieces:
+        last_lo, last_hi, last_a, last_b, last_parent = pieces[-1]
+        if last_hi - last_lo <= EPSILON:
+            pieces[-1] = (last_lo, hi, a, b, parent)
+            return
+        if hi - lo <= EPSILON or (last_a, last_b, last_parent) == (a, b, parent):
+            pieces[-1] = (last_lo, hi, last_a, last_b, last_parent)
+            return
+    pieces.append(piece)
+
+
+def _walk_edge(pieces: list, peso: float, parent: tuple) -> list:
+    return [(lo, hi, a + peso, b, parent) for lo, hi, a, b, _ in pieces]
+
+
+def _cross_light(
+    pieces: list,
+    traffic_light: TrafficLight,
+    direction: int,
+    peso: float,
+    parent: tuple,
+) -> list:
+    # the light lets the pedestrian go on the first time - offset - k * CYCLE
+    # in [0, go) and otherwise holds it until the next green of the direction
+    # starts (the same waits as TrafficLight.waiting_time_to_cross), so every
+    # piece is split where the time it reaches the light crosses those limits
+    green_start = (
+        0
+        if direction == traffic_light.initial_green_direction
+        else TRAFFIC_LIGHTS_ALTERNATION_TIME
+    )
+    offset = (green_start - traffic_light.initial_time) % CYCLE
+    go = TRAFFIC_LIGHTS_ALTERNATION_TIME - time_to_cross_street()
+
+    def leave(time: float) -> tuple:
+        # (a, b) of the time it leaves the light for arrivals around time
+        cycle_start = offset + math.floor((time - offset) / CYCLE) * CYCLE
+        if time - cycle_start < go:
+            return 0, 1
+        return cycle_start + CYCLE, 0
+
+    result = []
+    for lo, hi, a, b, _ in pieces:
+        if b == 0:
+            leave_a, leave_b = leave(a)
+            _append(result, (lo, hi, leave_a + leave_b * a + peso, 0, parent))
+            continue
+
+        start = a + b * lo
+        end = a + b * hi
+        limits = []
+        k = math.floor((start - offset) / CYCLE)
+        while offset + k * CYCLE < end:
+            for limit in (offset + k * CYCLE, offset + k * CYCLE + go):
+                if start < limit < end:
+                    limits.append(limit)
+            k += 1
+
+        # back to departure times, keeping the ends of the piece exact
+        times = [lo] + [(limit - a) / b for limit in limits] + [hi]
+        for piece_lo, piece_hi in zip(times, times[1:]):
+            leave_a, leave_b = leave(a + b * (piece_lo + piece_hi) / 2)
+            _append(
+                result,
+                (
+                    piece_lo,
+                    piece_hi,
+                    leave_a + leave_b * a + peso,
+                    leave_b * b,
+                    parent,
+                ),
+            )
+
+    return result
+
+
+def _minimum(old: list, new: list) -> tuple:
+    # pointwise minimum of two profiles, split where they cross, and whether
+    # the new one was better anywhere
+    if old is None:
+        return new, True
+
+    result = []
+    improved = False
+
+    def add(lo: float, hi: float, piece: tuple):
+        _append(result, (lo, hi) + piece[2:])
+
+    i = j = 0
+    lo = 0
+    while i < len(old) and j < len(new):
+        old_piece = old[i]
+        new_piece = new[j]
+        hi = min(old_piece[1], new_piece[1])
+
+        limits = [lo, hi]
+        slope = new_piece[3] - old_piece[3]
+        if slope != 0:
+            crossing = (old_piece[2] - new_piece[2]) / slope
+            if lo + EPSILON < crossing < hi - EPSILON:
+                limits.insert(1, crossing)
+
+        for piece_lo, piece_hi in zip(limits, limits[1:]):
+            middle = (piece_lo + piece_hi) / 2
+            old_arrival = old_piece[2] + old_piece[3] * middle
+            new_arrival = new_piece[2] + new_piece[3] * middle
+            if new_arrival < old_arrival - EPSILON and piece_hi - piece_lo > EPSILON:
+                improved = True
+                add(piece_lo, piece_hi, new_piece)
+            else:
+                add(piece_lo, piece_hi, old_piece)
+
+        lo = hi
+        if old_piece[1] == hi:
+            i += 1
+        if new_piece[1] == hi:
+            j += 1
+
+    return result, improved
+
+
+def profile_search(
+    city: Grafo,
+    traffic_ligths: list,
+    origin: tuple,
+    destination: tuple = None,
+) -> dict:
+    # the arrival at every corner for every departure time of a cycle in a
+    # single label correcting search: a corner is expanded in the order of
+    # the earliest arrival of its profile and expanded again whenever an
+    # arrival improves for some departure time; with a destination it stops
+    # once no corner can improve it; returns the ArrivalProfile of every
+    # corner reached
+    key, neighbours = search_space(city)
+    start = key(origin)
+
+    profiles = {start: [(0, CYCLE, 0, 1, None)]}
+    position = {start: origin}
+    queued = {start}
+    heap = [(0, start)]
+    end = None if destination is None else key(destination)
+
+    while heap:
+        earliest, v = heapq.heappop(heap)
+        if v not in queued:
+            continue
+        queued.remove(v)
+
+        # everything after v arrives later than its earliest arrival
+        if end in profiles and earliest >= _latest(profiles[end]):
+            break
+
+        current_position = position[v]
+        pieces = profiles[v]
+        for w, next_position, peso in neighbours(v):
+            direction = crossing_direction(current_position, next_position)
+            traffic_light = None
+            if direction is not None:
+                traffic_light = traffic_ligth_from_position(
+                    current_position, traffic_ligths
+                )
+
+            if traffic_light is None:
+                candidate = _walk_edge(pieces, peso, current_position)
+            else:
+                candidate = _cross_light(
+                    pieces, traffic_light, direction, peso, current_position
+                )
+
+            profiles[w], improved = _minimum(profiles.get(w), candidate)
+            if improved:
+                position[w] = next_position
+                queued.add(w)
+                heapq.heappush(heap, (_earliest(profiles[w]), w))
+
+    if end is not None and end not in profiles:
+        raise ValueError(f"{destination} can not be reached from {origin}")
+
+    return {position[v]: ArrivalProfile(pieces) for v, pieces in profiles.items()}
+
+
+def profile_route(profiles: dict, destination: tuple, departure_time: float) -> list:
+    # the corners of the best route for a departure time, following the
+    # parents back from the destination
+    route = [destination]
+    while profiles[route[-1]].parent(departure_time) is not None:
+        route.append(profiles[route[-1]].parent(departure_time))
+    route.reverse()
+    return route
@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+
+# every quantile is within this relative error of the exact one
+RELATIVE_ACCURACY = 0.01
+
+# values below MIN_VALUE share its bucket and values above MAX_VALUE share
+# the last one, so the memory is fixed: about 1200 buckets for 0.01
+MIN_VALUE = 1e-3  # s
+MAX_VALUE = 1e7  # s
+
+
+class QuantileSketch:
+    # streaming quantiles in fixed memory (ddsketch): bucket k counts the
+    # values in (gamma ** (k - 1), gamma ** k] and answers with a value
+    # within relative_accuracy of all of them; zeros, as a walk that never
+    # waited, have their own count; sketches with the same parameters merge
+    # exactly by adding their counts, so shards give the same sketch as a
+    # single run
+    def __init__(
+        self,
+        relative_accuracy: float = RELATIVE_ACCURACY,
+        min_value: float = MIN_VALUE,
+        max_value: float = MAX_VALUE,
+    ):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("The relative accuracy must be in (0, 1)")
+        if not 0 < min_value < max_value:
+            raise ValueError("The values must be 0 < min_value < max_value")
+
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._offset = math.ceil(math.log(min_value) / self._log_gamma)
+
+        buckets = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        self.counts = np.zeros(buckets, dtype=np.int64)
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _parameters(self) -> tuple:
+        return self.relative_accuracy, self.min_value, self.max_value
+
+    def add(self, value: float):
+        if value < 0:
+            raise ValueError("The sketch only takes non negative values")
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value == 0:
+            self.zero_count += 1
+            return
+
+        bucket = (
+            math.ceil(math.log(max(value, self.min_value)) / self._log_gamma)
+            - self._offset
+        )
+        self.counts[min(bucket, len(self.counts) - 1)] += 1
+
+    def add_many(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+        if values.min() < 0:
+            raise ValueError("The sketch only takes non negative values")
+        self.count += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        positive = values[values > 0]
+        self.zero_count += values.size - positive.size
+        buckets = (
+            np.ceil(np.log(np.maximum(positive, self.min_value)) / self._log_gamma)
+            - self._offset
+        )
+        self.counts += np.bincount(
+            np.minimum(buckets.astype(np.int64), len(self.counts) - 1),
+            minlength=len(self.counts),
+        )
+
+    def merge(self, other: "QuantileSketch"):
+        if self._parameters() != other._parameters():
+            raise ValueError("Only sketches with the same parameters can be merged")
+        self.counts += other.counts
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        # the value of rank floor(q * (count - 1)) in the sorted values, like
+        # np.quantile(values, q, method="lower")
+        if not 0 <= q <= 1:
+            raise ValueError("The quantile must be in [0, 1]")
+        if self.count == 0:
+            return math.nan
+
+        rank = math.floor(q * (self.count - 1))
+        if rank < self.zero_count:
+            return 0.0
+        if rank == self.count - 1:
+            return self.max
+        bucket = int(
+            np.searchsorted(np.cumsum(self.counts), rank - self.zero_count, "right")
+        )
+        value = 2 * self.gamma ** (bucket + self._offset) / (self.gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    def quantiles(self, qs: list) -> list:
+        return [self.quantile(q) for q in qs]
+
+    @property
+    def nbytes(self) -> int:
+        return self.counts.nbytes
+
+    def __repr__(self):
+        return (
+            f"QuantileSketch(count={self.count}, "
+            f"median={self.quantile(0.5)}, max={self.max})"
+        )
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+# part of every key, bump it whenever a change to a walk changes its results
+# so the cells simulated before are not read again
+ENGINE_VERSION = 1
+
+CACHE_DIRECTORY = ".simulation_cache"
+
+# a cell file is the magic, the number of values and the values as little
+# endian doubles
+_MAGIC = b"PWC1"
+_HEADER = struct.Struct("<4sI")
+
+
+def cell_key(parameters: dict) -> str:
+    # same parameters, same key, no matter their order
+    content = json.dumps(
+        {**parameters, "engine_version": ENGINE_VERSION},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def cell_path(key: str, directory: str = CACHE_DIRECTORY) -> str:
+    return os.path.join(directory, f"{key}.cell")
+
+
+def load_cell(key: str, directory: str = CACHE_DIRECTORY) -> tuple:
+    # the values of the cell, or None if it was never stored or is broken
+    try:
+        with open(cell_path(key, directory), "rb") as file:
+            content = file.read()
+    except FileNotFoundError:
+        return None
+
+    if len(content) < _HEADER.size:
+        return None
+    magic, length = _HEADER.unpack_from(content)
+    if magic != _MAGIC or len(content) != _HEADER.size + length * 8:
+        return None
+    return struct.unpack_from(f"<{length}d", content, _HEADER.size)
+
+
+def save_cell(key: str, values: tuple, directory: str = CACHE_DIRECTORY):
+    # written to a temporary file and renamed, so readers never see half a cell
+    os.makedirs(directory, exist_ok=True)
+    content = _HEADER.pack(_MAGIC, len(values)) + struct.pack(
+        f"<{len(values)}d", *values
+    )
+
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+        os.replace(temporary_path, cell_path(key, directory))
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def cached_cell(parameters: dict, simulate, directory: str = CACHE_DIRECTORY) -> tuple:
+    # simulate() returns the aggregates of the cell as a tuple of numbers, it
+    # only runs when the cell is not stored yet; the parameters must be
+    # everything the result depends on, seed included
+    key = cell_key(parameters)
+    values = load_cell(key, directory)
+    if values is None:
+        values = tuple(float(value) for value in simulate())
+        save_cell(key, values, directory)
+    return values
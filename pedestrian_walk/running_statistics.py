@@ -0,0 +1,113 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+CONFIDENCE = 0.95
+
+
+class RunningStatistics:
+    # online mean and variance (welford), batches and shards are combined with
+    # the parallel update of chan et al. so nothing per experiment is kept
+    def __init__(self, count: int = 0, mean: float = 0, m2: float = 0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def add_many(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        mean = values.mean()
+        self.merge(
+            RunningStatistics(
+                values.size, float(mean), float(((values - mean) ** 2).sum())
+            )
+        )
+
+    def merge(self, other: "RunningStatistics"):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else math.inf
+
+    @property
+    def standard_deviation(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def standard_error(self) -> float:
+        return math.sqrt(self.variance / self.count) if self.count > 1 else math.inf
+
+    def half_width(self, confidence: float = CONFIDENCE) -> float:
+        # normal approximation, fine for the thousands of experiments we run
+        return NormalDist().inv_cdf((1 + confidence) / 2) * self.standard_error
+
+    def confidence_interval(self, confidence: float = CONFIDENCE) -> tuple:
+        half_width = self.half_width(confidence)
+        return self.mean - half_width, self.mean + half_width
+
+    def relative_half_width(self, confidence: float = CONFIDENCE) -> float:
+        half_width = self.half_width(confidence)
+        if half_width == 0:
+            return 0
+        return half_width / abs(self.mean) if self.mean != 0 else math.inf
+
+    def __repr__(self):
+        return (
+            f"RunningStatistics(count={self.count}, mean={self.mean}, "
+            f"standard_error={self.standard_error})"
+        )
+
+
+def sample_until_precision(
+    simulate_batch,
+    relative_half_width: float,
+    batch_size: int = 10000,
+    confidence: float = CONFIDENCE,
+    min_experiments: int = 1000,
+    max_experiments: int = 10000000,
+) -> tuple:
+    # simulate_batch(number_of_experiments) returns one array per metric with
+    # a value per experiment; batches are drawn until every metric has a
+    # confidence interval narrower than relative_half_width times its mean,
+    # or max_experiments are done; the first batch is min_experiments and
+    # every next one doubles up to batch_size, so a loose target stops early
+    # and a tight one overshoots by less than the experiments already done
+    statistics = None
+    experiments = 0
+    batch = max(1, min(min_experiments, batch_size))
+
+    while experiments < max_experiments:
+        metrics = simulate_batch(min(batch, max_experiments - experiments))
+        batch = min(batch * 2, batch_size)
+        if statistics is None:
+            statistics = tuple(RunningStatistics() for _ in metrics)
+        for statistic, values in zip(statistics, metrics):
+            statistic.add_many(values)
+        experiments = statistics[0].count
+
+        if experiments >= min_experiments and all(
+            statistic.relative_half_width(confidence) <= relative_half_width
+            for statistic in statistics
+        ):
+            break
+
+    return statistics
@@ -0,0 +1,223 @@
+from dataclasses import asdict, replace
+
+import numpy as np
+
+from .city import (
+    HORIZONTAL,
+    HUMAN_VELOCITY,
+    STRATEGYS,
+    STREET_LENGTH,
+    STREET_WIDTH,
+    TRAFFIC_LIGHTS_ALTERNATION_TIME,
+    VERTICAL,
+    time_to_cross_street,
+    time_to_walk_street,
+)
+from .config import SimulationConfig
+from .kernels import run
+from .result_cache import CACHE_DIRECTORY, cached_cell
+from .running_statistics import RunningStatistics
+from .traffic_light_grid import TrafficLightGrid
+from .vectorized_walk import cross_lights
+
+# lights generated at once, the batch of experiments shrinks as the cities grow
+BATCH_LIGHTS = 2**22
+
+
+def cell_parameters(config: SimulationConfig) -> dict:
+    # the key of a cell is the config and the physical constants of the city;
+    # the numbers are normalised so a probability of 1 and of 1.0 are the
+    # same cell
+    parameters = asdict(config)
+    parameters["probability_of_traffic_light"] = float(
+        config.probability_of_traffic_light
+    )
+    for name in ["city_size", "strategy", "number_of_experiments", "workers"]:
+        parameters[name] = int(parameters[name])
+    if config.seed is not None:
+        parameters["seed"] = int(config.seed)
+    return {
+        **parameters,
+        "traffic_lights_alternation_time": TRAFFIC_LIGHTS_ALTERNATION_TIME,
+        "human_velocity": HUMAN_VELOCITY,
+        "street_length": STREET_LENGTH,
+        "street_width": STREET_WIDTH,
+    }
+
+
+def cached_run(config: SimulationConfig, directory: str = CACHE_DIRECTORY) -> tuple:
+    # kernels.run, simulated only the first time a cell is asked for
+    return cached_cell(cell_parameters(config), lambda: run(config), directory)
+
+
+def run_sizes(config: SimulationConfig, strategies: list = STRATEGYS) -> tuple:
+    # one cell per (strategy, city_size) up to config.city_size, each one read
+    # from the cache or simulated with the engine of the config; returns
+    # (total_times, total_waiting_times) keyed by (strategy, city_size)
+    total_times = {}
+    total_waiting_times = {}
+    for city_size in range(1, config.city_size + 1):
+        for strategy in strategies:
+            total_time, total_waiting_time = cached_run(
+                replace(config, city_size=city_size, strategy=strategy)
+            )
+            total_times[strategy, city_size] = total_time
+            total_waiting_times[strategy, city_size] = total_waiting_time
+    return total_times, total_waiting_times
+
+
+def walk_every_size(
+    traffic_ligths: TrafficLightGrid, strategy: int = None, rng=None
+) -> tuple:
+    # the walks of simulate_walks on every top left city of traffic_ligths at
+    # once; the walk of a size m and the one of the whole city take the same
+    # decisions while m has crossings left in both directions, the remaining
+    # crossings of both differ by the same m - city_size, so the whole city is
+    # walked once and every smaller size only walks its own tail, the
+    # crossings left in one direction after the other is done; returns the
+    # times and the waiting times with a row per size, row m - 1 for size m
+    rng = np.random.default_rng() if rng is None else rng
+    city_size = traffic_ligths.city_size
+    number_of_experiments = len(traffic_ligths)
+    experiments = np.arange(number_of_experiments)
+    light_step = (traffic_ligths.columns, 1)
+
+    light = traffic_ligths.light_index(experiments, 0, 0)
+    current_time = np.zeros(number_of_experiments)
+    waiting_time = np.zeros(number_of_experiments)
+    position = np.zeros((2, number_of_experiments), dtype=np.int64)
+    remaining_crossings = np.full((2, number_of_experiments), city_size)
+
+    # where every smaller size starts its tail, a row per size
+    tails = (city_size - 1, number_of_experiments)
+    tail_light = np.zeros(tails, dtype=np.int64)
+    tail_time = np.zeros(tails)
+    tail_waiting_time = np.zeros(tails)
+    tail_position = np.zeros((2,) + tails, dtype=np.int64)
+    tail_crossings = np.zeros((2,) + tails, dtype=np.int64)
+
+    end = city_size * 2 - 1
+    for _ in range(city_size * 2):
+        horizontal, _, _, _ = cross_lights(
+            traffic_ligths,
+            light,
+            current_time,
+            waiting_time,
+            remaining_crossings,
+            strategy,
+            rng,
+        )
+        vertical = ~horizontal
+
+        current_time += time_to_cross_street()
+        position[0] += horizontal
+        position[1] += vertical
+        remaining_crossings[0] -= horizontal
+        remaining_crossings[1] -= vertical
+
+        # the size m is done in a direction at the first crossing that takes
+        # it to m crossings, the other one has less; before the street after
+        # it, which the size m does not walk
+        crossed = city_size - remaining_crossings
+        done = np.where(horizontal, crossed[0], crossed[1])
+        other = np.where(horizontal, crossed[1], crossed[0])
+        ending = np.flatnonzero((done > other) & (done < city_size))
+        size = done[ending]
+        left = size - other[ending]
+        tail_light[size - 1, ending] = light[ending]
+        tail_time[size - 1, ending] = current_time[ending]
+        tail_waiting_time[size - 1, ending] = waiting_time[ending]
+        tail_position[:, size - 1, ending] = position[:, ending]
+        tail_crossings[0, size - 1, ending] = np.where(horizontal[ending], 0, left)
+        tail_crossings[1, size - 1, ending] = np.where(horizontal[ending], left, 0)
+
+        for direction in (HORIZONTAL, VERTICAL):
+            walk = (position[direction] & 1 == 1) & (position[direction] < end)
+            current_time += walk * time_to_walk_street()
+            position[direction] += walk
+            light += walk * light_step[direction]
+
+    # the tails, flat and sorted by their crossings so the ones still walking
+    # are always a prefix, like in simulate_trips
+    total_crossings = tail_crossings.sum(axis=0).ravel()
+    order = np.argsort(-total_crossings, kind="stable")
+    descending = -total_crossings[order]
+    tail_end = np.repeat(np.arange(1, city_size) * 2 - 1, number_of_experiments)[order]
+    tail_light = tail_light.ravel()[order]
+    tail_time = tail_time.ravel()[order]
+    tail_waiting_time = tail_waiting_time.ravel()[order]
+    tail_position = tail_position.reshape(2, -1)[:, order]
+    tail_crossings = tail_crossings.reshape(2, -1)[:, order]
+
+    for k in range(-descending[0] if len(descending) else 0):
+        n = np.searchsorted(descending, -k, "left")
+        horizontal, _, _, _ = cross_lights(
+            traffic_ligths,
+            tail_light[:n],
+            tail_time[:n],
+            tail_waiting_time[:n],
+            tail_crossings[:, :n],
+            strategy,
+            rng,
+        )
+        vertical = ~horizontal
+
+        tail_time[:n] += time_to_cross_street()
+        tail_position[0, :n] += horizontal
+        tail_position[1, :n] += vertical
+        tail_crossings[0, :n] -= horizontal
+        tail_crossings[1, :n] -= vertical
+
+        for direction in (HORIZONTAL, VERTICAL):
+            coordinate = tail_position[direction, :n]
+            walk = (coordinate & 1 == 1) & (coordinate < tail_end[:n])
+            tail_time[:n] += walk * time_to_walk_street()
+            coordinate += walk
+            tail_light[:n] += walk * light_step[direction]
+
+    times = np.empty((city_size, number_of_experiments))
+    waiting_times = np.empty((city_size, number_of_experiments))
+    times[:-1].reshape(-1)[order] = tail_time
+    waiting_times[:-1].reshape(-1)[order] = tail_waiting_time
+    times[-1] = current_time
+    waiting_times[-1] = waiting_time
+    return times, waiting_times
+
+
+def sweep_sizes(config: SimulationConfig, strategies: list = STRATEGYS) -> tuple:
+    # every experiment draws a single city of config.city_size and walks each
+    # smaller city on its top left corner with walk_every_size, so the whole
+    # curve costs one city and about one walk per experiment and the sizes
+    # share their lights (common random numbers); returns (times,
+    # waiting_times) keyed by (strategy, city_size)
+    rng = np.random.default_rng(config.seed)
+    max_size = config.city_size
+    number_of_experiments = config.number_of_experiments
+    probability_of_traffic_light = config.probability_of_traffic_light
+    batch_size = max(1, BATCH_LIGHTS // max_size**2)
+
+    keys = [
+        (strategy, city_size)
+        for strategy in strategies
+        for city_size in range(1, max_size + 1)
+    ]
+    times = {key: RunningStatistics() for key in keys}
+    waiting_times = {key: RunningStatistics() for key in keys}
+
+    for start in range(0, number_of_experiments, batch_size):
+        batch = min(batch_size, number_of_experiments - start)
+        traffic_ligths = TrafficLightGrid.random(
+            batch, max_size, rng, probability_of_traffic_light
+        )
+
+        for strategy in strategies:
+            batch_times, batch_waiting_times = walk_every_size(
+                traffic_ligths, strategy, rng
+            )
+            for city_size in range(1, max_size + 1):
+                times[strategy, city_size].add_many(batch_times[city_size - 1])
+                waiting_times[strategy, city_size].add_many(
+                    batch_waiting_times[city_size - 1]
+                )
+
+    return times, waiting_times
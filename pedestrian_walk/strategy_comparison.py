@@ -0,0 +1,43 @@
+from itertools import combinations
+
+import numpy as np
+
+from .city import STRATEGYS
+from .config import SimulationConfig
+from .running_statistics import RunningStatistics
+from .traffic_light_grid import TrafficLightGrid
+from .vectorized_walk import BATCH_SIZE, simulate_walks
+
+
+def compare_strategies(config: SimulationConfig, strategies: list = STRATEGYS) -> tuple:
+    # common random numbers: every city is drawn once and walked with every
+    # strategy, so the differences between strategies only come from the
+    # strategies and not from the luck of each city; config.strategy is not
+    # used
+    rng = np.random.default_rng(config.seed)
+    number_of_experiments = config.number_of_experiments
+
+    times = {strategy: RunningStatistics() for strategy in strategies}
+    waiting_times = {strategy: RunningStatistics() for strategy in strategies}
+    differences = {pair: RunningStatistics() for pair in combinations(strategies, 2)}
+
+    for start in range(0, number_of_experiments, BATCH_SIZE):
+        batch = min(BATCH_SIZE, number_of_experiments - start)
+        traffic_ligths = TrafficLightGrid.random(
+            batch, config.city_size, rng, config.probability_of_traffic_light
+        )
+
+        batch_times = {}
+        for strategy in strategies:
+            batch_times[strategy], batch_waiting_times = simulate_walks(
+                traffic_ligths, strategy, rng
+            )
+            times[strategy].add_many(batch_times[strategy])
+            waiting_times[strategy].add_many(batch_waiting_times)
+
+        for first, second in differences:
+            differences[first, second].add_many(
+                batch_times[first] - batch_times[second]
+            )
+
+    return times, waiting_times, differences
@@ -0,0 +1,95 @@
+import itertools
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import replace
+
+from .city import STRATEGYS
+from .config import SimulationConfig
+from .parallel_runner import WORKERS
+from .result_cache import CACHE_DIRECTORY, cell_key, load_cell
+from .size_sweep import cached_run, cell_parameters
+
+
+def sweep_cells(
+    config: SimulationConfig,
+    city_sizes: list,
+    probabilities_of_traffic_light: list,
+    strategies: list = STRATEGYS,
+) -> list:
+    # the cartesian grid as configs that only differ from config in the
+    # swept parameters, every cell runs on a single worker
+    return [
+        replace(
+            config,
+            city_size=city_size,
+            probability_of_traffic_light=probability_of_traffic_light,
+            strategy=strategy,
+            workers=1,
+        )
+        for city_size, probability_of_traffic_light, strategy in itertools.product(
+            city_sizes, probabilities_of_traffic_light, strategies
+        )
+    ]
+
+
+def cell_cost(config: SimulationConfig) -> int:
+    # every walk crosses city_size * 2 times
+    return config.city_size * config.number_of_experiments
+
+
+def run_sweep(
+    cells: list,
+    workers: int = WORKERS,
+    directory: str = CACHE_DIRECTORY,
+) -> dict:
+    # every cell is a work unit of the pool, the largest ones go first so the
+    # last ones to finish are short; a finished cell is stored in the cache of
+    # result_cache, atomically, so a killed sweep runs again only the cells
+    # that were not finished; returns (total_time, total_waiting_time) by
+    # config
+    results = {}
+    pending = []
+    for cell in cells:
+        values = load_cell(cell_key(cell_parameters(cell)), directory)
+        if values is None:
+            pending.append(cell)
+        else:
+            results[cell] = values
+    pending.sort(key=cell_cost, reverse=True)
+
+    total_cost = sum(cell_cost(cell) for cell in pending)
+    print(f"{len(results)} cells stored, {len(pending)} to run")
+    if not pending:
+        return results
+
+    done_cost = 0
+    experiments = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(cached_run, cell, directory): cell for cell in pending
+        }
+        try:
+            remaining = set(futures)
+            while remaining:
+                finished, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    cell = futures[future]
+                    results[cell] = future.result()
+                    done_cost += cell_cost(cell)
+                    experiments += cell.number_of_experiments
+
+                elapsed = time.perf_counter() - start
+                eta = elapsed * (total_cost - done_cost) / done_cost
+                print(
+                    f"{len(pending) - len(remaining)}/{len(pending)} cells,",
+                    f"{experiments / elapsed:.0f} experiments/s,",
+                    f"ETA {eta:.0f} s",
+                )
+        except BaseException:
+            # the finished cells are already stored
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    return results
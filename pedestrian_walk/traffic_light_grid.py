@@ -0,0 +1,171 @@
+import numpy as np
+
+from .city import (
+    HORIZONTAL,
+    TRAFFIC_LIGHTS_ALTERNATION_TIME,
+    VERTICAL,
+    time_to_cross_street,
+)
+
+
+def time_to_change(current_time: np.ndarray, initial_time: np.ndarray) -> np.ndarray:
+    return TRAFFIC_LIGHTS_ALTERNATION_TIME - (
+        (current_time + initial_time) % TRAFFIC_LIGHTS_ALTERNATION_TIME
+    )
+
+
+def which_direction_is_green(
+    current_time: np.ndarray,
+    initial_green_direction: np.ndarray,
+    initial_time: np.ndarray,
+) -> np.ndarray:
+    # same test as `(...) % 2 == 0` in TrafficLight, half a value is a whole
+    # number exactly when the value is an even one
+    half = ((current_time + initial_time) // TRAFFIC_LIGHTS_ALTERNATION_TIME) * 0.5
+    is_initial_green = np.floor(half) == half
+    return np.where(
+        is_initial_green, initial_green_direction, 1 - initial_green_direction
+    )
+
+
+def is_enougth_time_to_cross(
+    current_time: np.ndarray, initial_time: np.ndarray
+) -> np.ndarray:
+    return time_to_change(current_time, initial_time) > time_to_cross_street()
+
+
+class TrafficLightGrid:
+    # struct of arrays with one entry per (experiment, i, j) intersection,
+    # indexed like traffic_ligths[i][j] in the scripts; city_size can be
+    # smaller than the arrays to walk only their top left corner
+    def __init__(
+        self,
+        initial_green_direction: np.ndarray,
+        initial_time: np.ndarray,
+        present: np.ndarray = None,
+        city_size: int = None,
+    ):
+        if initial_green_direction.shape != initial_time.shape:
+            raise ValueError("Directions and times must have the same shape")
+        if present is not None and present.shape != initial_time.shape:
+            raise ValueError("Presence mask must have the same shape as the lights")
+
+        self.initial_green_direction = initial_green_direction.astype(
+            np.int8, copy=False
+        )
+        self.initial_time = initial_time
+        self.present = present
+        self.city_size = min(initial_time.shape[1:]) if city_size is None else city_size
+
+    @classmethod
+    def random(
+        cls,
+        number_of_experiments: int,
+        city_size: int,
+        rng: np.random.Generator,
+        probability_of_traffic_light: float = 1,
+        dtype: type = np.float64,
+    ) -> "TrafficLightGrid":
+        shape = (number_of_experiments, city_size, city_size)
+        initial_green_direction = rng.integers(
+            HORIZONTAL, VERTICAL + 1, size=shape, dtype=np.int8
+        )
+        initial_time = rng.random(shape, dtype=dtype)
+        initial_time *= TRAFFIC_LIGHTS_ALTERNATION_TIME
+
+        present = None
+        if probability_of_traffic_light < 1:
+            present = rng.random(shape, dtype=np.float32) < probability_of_traffic_light
+
+        return cls(initial_green_direction, initial_time, present)
+
+    @property
+    def number_of_experiments(self) -> int:
+        return self.initial_time.shape[0]
+
+    @property
+    def has_missing_lights(self) -> bool:
+        return self.present is not None
+
+    @property
+    def columns(self) -> int:
+        return self.initial_time.shape[2]
+
+    @property
+    def nbytes(self) -> int:
+        nbytes = self.initial_green_direction.nbytes + self.initial_time.nbytes
+        return nbytes + (0 if self.present is None else self.present.nbytes)
+
+    def __len__(self) -> int:
+        return self.number_of_experiments
+
+    def __getitem__(self, experiments) -> "TrafficLightGrid":
+        return TrafficLightGrid(
+            self.initial_green_direction[experiments],
+            self.initial_time[experiments],
+            None if self.present is None else self.present[experiments],
+            self.city_size,
+        )
+
+    def top_left(self, city_size: int) -> "TrafficLightGrid":
+        # the smaller city shares the arrays, nothing is copied
+        if city_size > min(self.initial_time.shape[1:]):
+            raise ValueError(f"The lights do not cover a city of size {city_size}")
+        return TrafficLightGrid(
+            self.initial_green_direction, self.initial_time, self.present, city_size
+        )
+
+    def light_index(
+        self, experiment: np.ndarray, i: np.ndarray, j: np.ndarray
+    ) -> np.ndarray:
+        # moving to the next i adds columns to the index, the next j adds one
+        _, rows, columns = self.initial_time.shape
+        return (experiment * rows + i) * columns + j
+
+    def lights_at(self, index: np.ndarray) -> tuple:
+        return (
+            self.initial_green_direction.reshape(-1).take(index),
+            self.initial_time.reshape(-1).take(index),
+        )
+
+    def is_present_at(self, index: np.ndarray) -> np.ndarray:
+        if self.present is None:
+            return np.ones(np.shape(index), dtype=bool)
+        return self.present.reshape(-1).take(index)
+
+    def lights(self, experiment: np.ndarray, i: np.ndarray, j: np.ndarray) -> tuple:
+        return self.lights_at(self.light_index(experiment, i, j))
+
+    def is_present(
+        self, experiment: np.ndarray, i: np.ndarray, j: np.ndarray
+    ) -> np.ndarray:
+        return self.is_present_at(self.light_index(experiment, i, j))
+
+    def time_to_change(
+        self,
+        experiment: np.ndarray,
+        i: np.ndarray,
+        j: np.ndarray,
+        current_time: np.ndarray,
+    ) -> np.ndarray:
+        _, initial_time = self.lights(experiment, i, j)
+        return time_to_change(current_time, initial_time)
+
+    def which_direction_is_green(
+        self,
+        experiment: np.ndarray,
+        i: np.ndarray,
+        j: np.ndarray,
+        current_time: np.ndarray,
+    ) -> np.ndarray:
+        return which_direction_is_green(current_time, *self.lights(experiment, i, j))
+
+    def is_enougth_time_to_cross(
+        self,
+        experiment: np.ndarray,
+        i: np.ndarray,
+        j: np.ndarray,
+        current_time: np.ndarray,
+    ) -> np.ndarray:
+        _, initial_time = self.lights(experiment, i, j)
+        return is_enougth_time_to_cross(current_time, initial_time)
@@ -0,0 +1,88 @@
+import numpy as np
+
+from .config import SimulationConfig
+
+TRAJECTORIES_FILE = "trajectories.npy"
+
+# scalar records wait in lists and go to the file this many at a time
+BUFFER_SIZE = 4096
+
+
+def record_dtype(crossings: int) -> np.dtype:
+    # one fixed width record per experiment; the waits of each crossing in
+    # the order they are crossed, as singles to keep 100M records on disk
+    return np.dtype(
+        [
+            ("time", np.float64),
+            ("waiting_time", np.float64),
+            ("stops", np.int32),
+            ("crossing_waits", np.float32, (crossings,)),
+        ]
+    )
+
+
+class TrajectoryRecorder:
+    # optional argument of the scalar and vectorized kernels, writes a record
+    # per experiment to a .npy file mapped in memory, so load_trajectories
+    # can slice it without reading it; the file is sized for all the
+    # experiments of the config up front
+    def __init__(self, config: SimulationConfig, path: str = TRAJECTORIES_FILE):
+        self.crossings = config.city_size * 2
+        self.records = np.lib.format.open_memmap(
+            path,
+            mode="w+",
+            dtype=record_dtype(self.crossings),
+            shape=(config.number_of_experiments,),
+        )
+        self.size = 0
+        self._times = []
+        self._waiting_times = []
+        self._crossing_waits = []
+
+    def __len__(self) -> int:
+        return self.size + len(self._times)
+
+    def record(self, time: float, waiting_time: float, crossing_waits: list):
+        self._times.append(time)
+        self._waiting_times.append(waiting_time)
+        self._crossing_waits.append(crossing_waits)
+        if len(self._times) == BUFFER_SIZE:
+            self._write_buffer()
+
+    def record_many(
+        self,
+        times: np.ndarray,
+        waiting_times: np.ndarray,
+        crossing_waits: np.ndarray,
+    ):
+        # crossing_waits has an experiment per row
+        self._write_buffer()
+        if self.size + len(times) > len(self.records):
+            raise ValueError("More experiments than the recorder was sized for")
+
+        records = self.records[self.size : self.size + len(times)]
+        records["time"] = times
+        records["waiting_time"] = waiting_times
+        records["stops"] = np.count_nonzero(crossing_waits, axis=1)
+        records["crossing_waits"] = crossing_waits
+        self.size += len(times)
+
+    def _write_buffer(self):
+        if not self._times:
+            return
+        times = np.array(self._times)
+        waiting_times = np.array(self._waiting_times)
+        crossing_waits = np.array(self._crossing_waits, dtype=np.float32)
+        self._times = []
+        self._waiting_times = []
+        self._crossing_waits = []
+        self.record_many(times, waiting_times, crossing_waits)
+
+    def flush(self):
+        self._write_buffer()
+        self.records.flush()
+
+
+def load_trajectories(path: str = TRAJECTORIES_FILE) -> np.ndarray:
+    # the records are read from disk only when they are sliced
+    return np.load(path, mmap_mode="r")
@@ -0,0 +1,282 @@
+import time
+
+import numpy as np
+
+from .city import (
+    HORIZONTAL,
+    STRATEGY_DIAGONALLY,
+    STRATEGY_HORIZONTALLY,
+    STRATEGY_RANDOM,
+    STRATEGY_VERTICALLY,
+    VERTICAL,
+    time_to_cross_street,
+    time_to_walk_street,
+    trip_crossings,
+)
+from .config import SimulationConfig
+from .running_statistics import sample_until_precision
+from .traffic_light_grid import (
+    TrafficLightGrid,
+    time_to_change,
+    which_direction_is_green,
+)
+from .trajectory_recorder import TrajectoryRecorder
+from .walk_counters import (
+    CROSSING,
+    CROSSING_AFTER_CHANGE,
+    LOCKSTEP,
+    STREET,
+    WAIT_FOR_TIME,
+    WITHOUT_LIGHT,
+    WalkCounters,
+)
+
+# experiments simulated at the same time, bounds the memory of the light arrays
+BATCH_SIZE = 32768
+
+
+def simulate_walks(
+    traffic_ligths,
+    strategy: int = None,
+    rng: np.random.Generator = None,
+    counters: WalkCounters = None,
+    crossing_waits: np.ndarray = None,
+) -> tuple:
+    # the walk always takes a street when it can, so every traffic light is
+    # followed by at most one horizontal and one vertical street and each
+    # experiment crosses exactly city_size * 2 times, which lets all of them
+    # advance in lockstep; at a light the coordinate of a direction is odd only
+    # when its crossings are done, so the remaining crossings alone decide
+    # whether the green direction can be taken; intersections without a
+    # traffic light are crossed right away in the direction of the strategy
+    # traffic_ligths is a TrafficLightGrid or a HashedTrafficLights, the walk
+    # only reads them through light_index, lights_at and is_present_at;
+    # counters get the branches of every experiment and, as step times, the
+    # time of each lockstep iteration over all of them; crossing_waits, an
+    # experiment per row and a column per crossing, gets the waits
+    missing_lights = traffic_ligths.has_missing_lights
+    if missing_lights and strategy is None:
+        raise ValueError("A strategy is needed for intersections without lights")
+    rng = np.random.default_rng() if rng is None else rng
+
+    number_of_experiments = len(traffic_ligths)
+    end = traffic_ligths.city_size * 2 - 1
+    light = traffic_ligths.light_index(np.arange(number_of_experiments), 0, 0)
+    light_step = (traffic_ligths.columns, 1)
+
+    current_time = np.zeros(number_of_experiments)
+    waiting_time = np.zeros(number_of_experiments)
+    position = np.zeros((2, number_of_experiments), dtype=np.int64)
+    remaining_crossings = np.full((2, number_of_experiments), trip_crossings(0, end))
+    if counters is not None:
+        light_queries = np.zeros(number_of_experiments, dtype=np.int64)
+        mark = time.perf_counter_ns()
+
+    for crossing in range(trip_crossings(0, end) * 2):
+        if crossing_waits is not None:
+            crossing_waits[:, crossing] = waiting_time
+        horizontal, not_enougth_time, wait_for_change, with_light = cross_lights(
+            traffic_ligths,
+            light,
+            current_time,
+            waiting_time,
+            remaining_crossings,
+            strategy,
+            rng,
+        )
+        if crossing_waits is not None:
+            crossing_waits[:, crossing] = waiting_time - crossing_waits[:, crossing]
+        if counters is not None:
+            _count_crossings(
+                counters, light_queries, not_enougth_time, wait_for_change, with_light
+            )
+        vertical = ~horizontal
+
+        current_time += time_to_cross_street()
+        position[0] += horizontal
+        position[1] += vertical
+        remaining_crossings[0] -= horizontal
+        remaining_crossings[1] -= vertical
+
+        for direction in (HORIZONTAL, VERTICAL):
+            walk = (position[direction] & 1 == 1) & (position[direction] < end)
+            current_time += walk * time_to_walk_street()
+            position[direction] += walk
+            light += walk * light_step[direction]
+            if counters is not None:
+                counters.count(STREET, int(np.count_nonzero(walk)))
+
+        if counters is not None:
+            now = time.perf_counter_ns()
+            counters.add_step_time(LOCKSTEP, now - mark)
+            counters.count(LOCKSTEP)
+            mark = now
+
+    if counters is not None:
+        counters.add_light_queries(light_queries)
+
+    return current_time, waiting_time
+
+
+def cross_lights(
+    traffic_ligths,
+    light: np.ndarray,
+    current_time: np.ndarray,
+    waiting_time: np.ndarray,
+    remaining_crossings: np.ndarray,
+    strategy: int = None,
+    rng: np.random.Generator = None,
+) -> tuple:
+    # the rules of every walker at its light, the index light: wait when
+    # there is not enougth time, take the green direction if it is useful and
+    # the other one after it changes, and the strategy where there is no
+    # light; the waits go to current_time and waiting_time in place; returns
+    # whether each one crosses horizontally and, for the counters, the masks
+    # of the waits for time, the waits for the change and the lights present
+    # (None when there are lights everywhere)
+    missing_lights = traffic_ligths.has_missing_lights
+    light_direction, light_time = traffic_ligths.lights_at(light)
+
+    with_light = None
+    not_enougth_time = (
+        time_to_change(current_time, light_time) <= time_to_cross_street()
+    )
+    if missing_lights:
+        with_light = traffic_ligths.is_present_at(light)
+        not_enougth_time &= with_light
+    _wait_for_change(
+        current_time, waiting_time, light_time, np.flatnonzero(not_enougth_time)
+    )
+
+    horizontal = (
+        which_direction_is_green(current_time, light_direction, light_time)
+        == HORIZONTAL
+    )
+    can_cross_green = (
+        np.where(horizontal, remaining_crossings[0], remaining_crossings[1]) > 0
+    )
+    wait_for_change = ~can_cross_green
+    if missing_lights:
+        wait_for_change &= with_light
+    _wait_for_change(
+        current_time, waiting_time, light_time, np.flatnonzero(wait_for_change)
+    )
+    horizontal ^= wait_for_change
+    if missing_lights:
+        horizontal = np.where(
+            with_light,
+            horizontal,
+            strategy_is_horizontal(strategy, remaining_crossings, rng),
+        )
+
+    return horizontal, not_enougth_time, wait_for_change, with_light
+
+
+def _count_crossings(
+    counters: WalkCounters,
+    light_queries: np.ndarray,
+    not_enougth_time: np.ndarray,
+    wait_for_change: np.ndarray,
+    with_light: np.ndarray = None,
+):
+    # same queries as the scripts: is there enougth time and which direction
+    # is green, plus the time to change of every wait
+    changes = int(np.count_nonzero(wait_for_change))
+    lights = len(light_queries) if with_light is None else int(with_light.sum())
+    counters.count(WAIT_FOR_TIME, int(np.count_nonzero(not_enougth_time)))
+    counters.count(CROSSING_AFTER_CHANGE, changes)
+    counters.count(CROSSING, lights - changes)
+    counters.count(WITHOUT_LIGHT, len(light_queries) - lights)
+
+    queries = 2 + not_enougth_time + wait_for_change
+    light_queries += queries if with_light is None else queries * with_light
+
+
+def strategy_is_horizontal(
+    strategy: int, remaining_crossings: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    remaining_horizontal, remaining_vertical = remaining_crossings
+
+    if strategy == STRATEGY_RANDOM:
+        horizontal = rng.random(remaining_horizontal.shape) < 0.5
+    elif strategy == STRATEGY_HORIZONTALLY:
+        horizontal = np.ones(remaining_horizontal.shape, dtype=bool)
+    elif strategy == STRATEGY_VERTICALLY:
+        horizontal = np.zeros(remaining_horizontal.shape, dtype=bool)
+    elif strategy == STRATEGY_DIAGONALLY:
+        horizontal = remaining_horizontal >= remaining_vertical
+    else:
+        raise ValueError(f"Unknown strategy {strategy}")
+
+    # a direction with no crossings left is never taken
+    return (horizontal | (remaining_vertical == 0)) & (remaining_horizontal > 0)
+
+
+def _wait_for_change(
+    current_time: np.ndarray,
+    waiting_time: np.ndarray,
+    initial_time: np.ndarray,
+    waiting: np.ndarray,
+):
+    time = current_time[waiting]
+    change = time_to_change(time, initial_time[waiting])
+
+    current_time[waiting] = time + change
+    waiting_time[waiting] += change
+
+
+def _random_grids(config: SimulationConfig, rng: np.random.Generator):
+    # simulate_batch for sample_until_precision
+    return lambda batch, crossing_waits=None: simulate_walks(
+        TrafficLightGrid.random(
+            batch, config.city_size, rng, config.probability_of_traffic_light
+        ),
+        config.strategy,
+        rng,
+        crossing_waits=crossing_waits,
+    )
+
+
+def run_experiments(
+    config: SimulationConfig,
+    recorder: TrajectoryRecorder = None,
+    sketches: tuple = None,
+) -> tuple:
+    # sketches, a QuantileSketch for the time and one for the waiting time,
+    # get every batch
+    rng = np.random.default_rng(config.seed)
+    simulate_batch = _random_grids(config, rng)
+
+    total_time = 0
+    total_waiting_time = 0
+
+    for start in range(0, config.number_of_experiments, BATCH_SIZE):
+        batch = min(BATCH_SIZE, config.number_of_experiments - start)
+        crossing_waits = None
+        if recorder is not None:
+            # a column per crossing, contiguous for the walk to fill
+            crossing_waits = np.empty((batch, config.city_size * 2), order="F")
+        times, waiting_times = simulate_batch(batch, crossing_waits)
+        if recorder is not None:
+            recorder.record_many(times, waiting_times, crossing_waits)
+        if sketches is not None:
+            sketches[0].add_many(times)
+            sketches[1].add_many(waiting_times)
+        total_time += times.sum()
+        total_waiting_time += waiting_times.sum()
+
+    return total_time, total_waiting_time
+
+
+def run_until_precision(
+    config: SimulationConfig, relative_half_width: float, **kwargs
+) -> tuple:
+    # returns the RunningStatistics of the time and of the waiting time,
+    # config.number_of_experiments is not used; BATCH_SIZE only bounds the
+    # batches, which grow from min_experiments
+    return sample_until_precision(
+        _random_grids(config, np.random.default_rng(config.seed)),
+        relative_half_width,
+        batch_size=BATCH_SIZE,
+        **kwargs,
+    )
@@ -0,0 +1,242 @@
+import random
+
+from .city import (
+    HORIZONTAL,
+    START_POINT,
+    STRATEGY_DIAGONALLY,
+    STRATEGY_HORIZONTALLY,
+    STRATEGY_RANDOM,
+    STRATEGY_VERTICALLY,
+    VERTICAL,
+    TrafficLight,
+    can_walk_street,
+    create_traffic_ligths,
+    time_to_cross_street,
+    time_to_walk_street,
+    traffic_ligth_from_position,
+    trip_crossings,
+    trip_streets,
+)
+from .config import SimulationConfig
+from .crossing_policy import CrossingPolicy, phase_of, solve_policy
+from .trajectory_recorder import TrajectoryRecorder
+from .walk_counters import (
+    CROSSING,
+    CROSSING_AFTER_CHANGE,
+    STREET,
+    WAIT_FOR_TIME,
+    WITHOUT_LIGHT,
+    WalkCounters,
+)
+
+
+def cross_light(
+    traffic_light: TrafficLight, current_time: float, remaining_crossings: list
+) -> tuple:
+    # the rules at a light: wait when there is not enougth time to cross, take
+    # the green direction if it is useful and the other one after it changes;
+    # at a light the coordinate of a direction is odd only when its crossings
+    # are done, so the remaining crossings alone decide; returns the direction
+    # and the waits for time and for the change, 0 when there was none
+    wait_for_time = 0
+    time_to_change = traffic_light.time_to_change(current_time)
+    # TrafficLight.is_enougth_time_to_cross without asking twice
+    if not time_to_change > time_to_cross_street():
+        wait_for_time = time_to_change
+        current_time += wait_for_time
+
+    direction = traffic_light.which_direction_is_green(current_time)
+    wait_for_change = 0
+    if remaining_crossings[direction] == 0:
+        wait_for_change = traffic_light.time_to_change(current_time)
+        direction = 1 - direction
+
+    return direction, wait_for_time, wait_for_change
+
+
+def direction_without_light(
+    strategy: int, remaining_horizontal: int, remaining_vertical: int, rng
+) -> int:
+    # the strategy where there is no light, never a direction with no
+    # crossings left; rng only needs a choice method
+    if remaining_horizontal == 0:
+        return VERTICAL
+    if remaining_vertical == 0:
+        return HORIZONTAL
+    if strategy == STRATEGY_RANDOM:
+        return rng.choice([HORIZONTAL, VERTICAL])
+    if strategy == STRATEGY_HORIZONTALLY:
+        return HORIZONTAL
+    if strategy == STRATEGY_VERTICALLY:
+        return VERTICAL
+    if strategy == STRATEGY_DIAGONALLY:
+        return HORIZONTAL if remaining_horizontal >= remaining_vertical else VERTICAL
+    raise ValueError(f"Unknown strategy {strategy}")
+
+
+def walk(
+    traffic_ligths: list,
+    end_point: tuple,
+    strategy: int = STRATEGY_DIAGONALLY,
+    rng: random.Random = random,
+    counters: WalkCounters = None,
+    crossing_waits: list = None,
+    policy: CrossingPolicy = None,
+) -> tuple:
+    # a street when there is one, otherwise the green direction if it is
+    # useful and the other one after it changes; intersections without a
+    # light are crossed right away in the direction of the strategy; returns
+    # the time and the time spent waiting, and appends the wait of every
+    # crossing to crossing_waits when it is given; a policy decides the
+    # direction at every intersection instead
+    current_time = 0
+    total_waiting_time = 0
+    current_position = START_POINT
+
+    remaining_streets = [
+        trip_streets(START_POINT[0], end_point[0]),
+        trip_streets(START_POINT[1], end_point[1]),
+    ]
+
+    remaining_crossings = [
+        trip_crossings(START_POINT[0], end_point[0]),
+        trip_crossings(START_POINT[1], end_point[1]),
+    ]
+
+    if counters is not None:
+        counters.start_experiment()
+
+    while current_position != end_point:
+        if can_walk_street(current_position[0]) and remaining_streets[0] > 0:
+            current_time += time_to_walk_street()
+            current_position = (current_position[0] + 1, current_position[1])
+            remaining_streets[0] -= 1
+            if counters is not None:
+                counters.step(STREET)
+            continue
+
+        if can_walk_street(current_position[1]) and remaining_streets[1] > 0:
+            current_time += time_to_walk_street()
+            current_position = (current_position[0], current_position[1] + 1)
+            remaining_streets[1] -= 1
+            if counters is not None:
+                counters.step(STREET)
+            continue
+
+        traffic_light = traffic_ligth_from_position(current_position, traffic_ligths)
+
+        if traffic_light is None:
+
+            if policy is not None and remaining_crossings[0] and remaining_crossings[1]:
+                direction = policy.direction(*remaining_crossings)
+            else:
+                direction = direction_without_light(strategy, *remaining_crossings, rng)
+
+            current_time += time_to_cross_street()
+            remaining_crossings[direction] -= 1
+            current_position = (
+                current_position[0] + (direction == HORIZONTAL),
+                current_position[1] + (direction == VERTICAL),
+            )
+            if counters is not None:
+                counters.step(WITHOUT_LIGHT)
+            if crossing_waits is not None:
+                crossing_waits.append(0)
+            continue
+
+        if policy is not None:
+            direction = policy.direction(
+                *remaining_crossings, phase_of(traffic_light, current_time)
+            )
+            waiting_time = traffic_light.waiting_time_to_cross(current_time, direction)
+            current_time += waiting_time + time_to_cross_street()
+            total_waiting_time += waiting_time
+            current_position = (
+                current_position[0] + (direction == HORIZONTAL),
+                current_position[1] + (direction == VERTICAL),
+            )
+            remaining_crossings[direction] -= 1
+            if counters is not None:
+                counters.step(
+                    CROSSING if waiting_time == 0 else CROSSING_AFTER_CHANGE,
+                    light_queries=2,
+                )
+            if crossing_waits is not None:
+                crossing_waits.append(waiting_time)
+            continue
+
+        direction, wait_for_time, wait_for_change = cross_light(
+            traffic_light, current_time, remaining_crossings
+        )
+        current_time += wait_for_time
+        current_time += wait_for_change
+        total_waiting_time += wait_for_time
+        total_waiting_time += wait_for_change
+
+        current_time += time_to_cross_street()
+        current_position = (
+            current_position[0] + (direction == HORIZONTAL),
+            current_position[1] + (direction == VERTICAL),
+        )
+        remaining_crossings[direction] -= 1
+        if counters is not None:
+            if wait_for_time:
+                counters.count(WAIT_FOR_TIME, light_queries=1)
+            if wait_for_change:
+                counters.step(CROSSING_AFTER_CHANGE, light_queries=3)
+            else:
+                counters.step(CROSSING, light_queries=2)
+        if crossing_waits is not None:
+            crossing_waits.append(wait_for_time + wait_for_change)
+
+    if counters is not None:
+        counters.end_experiment()
+
+    return current_time, total_waiting_time
+
+
+def run_experiments(
+    config: SimulationConfig,
+    counters: WalkCounters = None,
+    recorder: TrajectoryRecorder = None,
+    sketches: tuple = None,
+    policy: CrossingPolicy = None,
+) -> tuple:
+    # the scalar kernel, a new city for every experiment; sketches, a
+    # QuantileSketch for the time and one for the waiting time, get every
+    # experiment; a policy replaces the strategy
+    rng = random.Random(config.seed)
+
+    total_time = 0
+    total_waiting_time = 0
+
+    for _ in range(config.number_of_experiments):
+        traffic_ligths = create_traffic_ligths(
+            config.city_size, config.probability_of_traffic_light, rng
+        )
+        crossing_waits = None if recorder is None else []
+        time, waiting_time = walk(
+            traffic_ligths,
+            config.end_point,
+            config.strategy,
+            rng,
+            counters,
+            crossing_waits=crossing_waits,
+            policy=policy,
+        )
+        if recorder is not None:
+            recorder.record(time, waiting_time, crossing_waits)
+        if sketches is not None:
+            sketches[0].add(time)
+            sketches[1].add(waiting_time)
+        total_time += time
+        total_waiting_time += waiting_time
+
+    return total_time, total_waiting_time
+
+
+def run_policy_experiments(config: SimulationConfig) -> tuple:
+    # the scalar kernel with the optimal policy of the config, the strategy
+    # is not used
+    policy = solve_policy(config.city_size, config.probability_of_traffic_light)
+    return run_experiments(config, policy=policy)
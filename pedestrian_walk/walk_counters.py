@@ -0,0 +1,111 @@
+import time
+from collections import Counter
+
+import numpy as np
+
+# branches of the walk loop, every step is exactly one of them
+STREET = "street"
+CROSSING = "crossing"
+CROSSING_AFTER_CHANGE = "crossing after change"
+WITHOUT_LIGHT = "without light"
+# waits for enougth time to cross, they happen inside a crossing step
+WAIT_FOR_TIME = "wait for enougth time"
+# iterations of the vectorized walk, each one steps every experiment
+LOCKSTEP = "lockstep"
+
+BRANCHES = [
+    STREET,
+    CROSSING,
+    CROSSING_AFTER_CHANGE,
+    WITHOUT_LIGHT,
+    WAIT_FOR_TIME,
+    LOCKSTEP,
+]
+
+
+class WalkCounters:
+    # optional argument of the walk loops, they only touch it when it is not
+    # None so a disabled run costs a test per branch at most; step times go
+    # to histograms of power of two buckets, bucket b holds the steps that
+    # took from 2**(b - 1) to 2**b nanoseconds
+    def __init__(self):
+        self.branches = Counter()
+        self.step_histograms = {}
+        # light queries in an experiment -> experiments
+        self.light_queries = Counter()
+        self._mark = None
+        self._queries = 0
+
+    def start_experiment(self):
+        self._queries = 0
+        self._mark = time.perf_counter_ns()
+
+    def end_experiment(self):
+        self.light_queries[self._queries] += 1
+
+    def step(self, branch: str, light_queries: int = 0):
+        # the step is the time since the previous step of the experiment
+        now = time.perf_counter_ns()
+        self.add_step_time(branch, now - self._mark)
+        self._mark = now
+        self.count(branch, light_queries=light_queries)
+
+    def count(self, branch: str, times: int = 1, light_queries: int = 0):
+        self.branches[branch] += times
+        self._queries += light_queries
+
+    def add_step_time(self, branch: str, nanoseconds: int, steps: int = 1):
+        histogram = self.step_histograms.setdefault(branch, Counter())
+        histogram[int(nanoseconds).bit_length()] += steps
+
+    def add_light_queries(self, light_queries: np.ndarray):
+        # queries of many experiments at once, for the vectorized walk
+        queries, experiments = np.unique(light_queries, return_counts=True)
+        for query, experiment in zip(queries.tolist(), experiments.tolist()):
+            self.light_queries[query] += experiment
+
+    def merge(self, other: "WalkCounters"):
+        self.branches.update(other.branches)
+        for branch, histogram in other.step_histograms.items():
+            self.step_histograms.setdefault(branch, Counter()).update(histogram)
+        self.light_queries.update(other.light_queries)
+
+    @property
+    def experiments(self) -> int:
+        return sum(self.light_queries.values())
+
+    def average_light_queries(self) -> float:
+        if self.experiments == 0:
+            return 0
+        return (
+            sum(query * count for query, count in self.light_queries.items())
+            / self.experiments
+        )
+
+    def step_time_percentile(self, branch: str, percentile: float) -> int:
+        # upper bound of the bucket holding the percentile, in nanoseconds
+        histogram = self.step_histograms.get(branch, Counter())
+        steps = sum(histogram.values())
+        seen = 0
+        for bucket in sorted(histogram):
+            seen += histogram[bucket]
+            if seen >= steps * percentile / 100:
+                return 2**bucket
+        return 0
+
+    def report(self) -> str:
+        experiments = max(self.experiments, 1)
+        lines = [f"Experiments: {self.experiments}"]
+        for branch in BRANCHES:
+            per_experiment = self.branches[branch] / experiments
+            line = f"{branch:>22}: {per_experiment:10.3f} per experiment"
+            if branch in self.step_histograms:
+                line += (
+                    f", median step < {self.step_time_percentile(branch, 50)} ns"
+                    f", p99 < {self.step_time_percentile(branch, 99)} ns"
+                )
+            lines.append(line)
+        lines.append(
+            f"Light queries: {self.average_light_queries():.3f} per experiment"
+        )
+        return "\n".join(lines)
@@ -0,0 +1,36 @@
+import pytest
+
+from pedestrian_walk.cli import SWEEP_PROBABILITIES_OF_TRAFFIC_LIGHT, main, parser
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["policy", "--bins", "7"],
+        ["policy", "--strategy", "random"],
+        ["policy", "--seed", "1"],
+        ["analytic", "--experiments", "10"],
+        ["compare", "--strategy", "random"],
+        ["route", "--experiments", "10"],
+        ["profile", "--strategy", "random"],
+        ["precision", "--engine", "scalar"],
+    ],
+)
+def test_flags_a_command_ignores_are_rejected(argv):
+    with pytest.raises(SystemExit):
+        parser().parse_args(argv)
+
+
+def test_nested_sizes_reject_engines(capsys):
+    with pytest.raises(SystemExit):
+        main(["sizes", "--nested", "--engine", "scalar", "--city-size", "2"])
+    assert "--nested" in capsys.readouterr().err
+
+
+def test_sweep_probabilities_are_floats():
+    assert all(isinstance(p, float) for p in SWEEP_PROBABILITIES_OF_TRAFFIC_LIGHT)
+
+
+def test_walk(capsys):
+    main(["walk", "--city-size", "3", "--experiments", "100", "--seed", "1"])
+    assert "Average time" in capsys.readouterr().out
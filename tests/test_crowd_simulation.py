@@ -0,0 +1,84 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from pedestrian_walk.batched_trips import simulate_trips
+from pedestrian_walk.city import (
+    START_POINT,
+    STRATEGY_DIAGONALLY,
+    STRATEGY_HORIZONTALLY,
+    STRATEGY_RANDOM,
+    create_traffic_ligths,
+    end_point_of,
+)
+from pedestrian_walk.crowd_simulation import CrowdSimulation, random_corner
+from pedestrian_walk.walk import walk
+
+from .test_walk import grid_of
+
+
+def crowd_of(
+    city_size: int,
+    probability_of_traffic_light: float,
+    strategy: int,
+    lookahead: float = math.inf,
+    seed: int = 0,
+) -> tuple:
+    # 2000 pedestrians with random trips, returns the lights, the crowd after
+    # running and the origins
+    rng = random.Random(seed)
+    traffic_ligths = create_traffic_ligths(city_size, probability_of_traffic_light, rng)
+    crowd = CrowdSimulation(traffic_ligths, strategy, rng, lookahead)
+    origins = []
+    for _ in range(2000):
+        origins.append(random_corner(city_size, rng))
+        crowd.add_pedestrian(
+            origins[-1], random_corner(city_size, rng), rng.random() * 3600
+        )
+    crowd.run()
+    return traffic_ligths, crowd, origins
+
+
+def test_crowd_walks_like_walk():
+    rng = random.Random(5)
+    for _ in range(100):
+        traffic_ligths = create_traffic_ligths(6, 1, rng)
+        crowd = CrowdSimulation(traffic_ligths)
+        crowd.add_pedestrian(START_POINT, end_point_of(6))
+        crowd.run()
+        expected = walk(traffic_ligths, end_point_of(6))
+        assert (crowd.arrival_times[0], crowd.waiting_times[0]) == expected
+
+
+@pytest.mark.parametrize(
+    "probability_of_traffic_light, strategy",
+    [
+        (1, STRATEGY_DIAGONALLY),
+        (0.5, STRATEGY_DIAGONALLY),
+        (0.3, STRATEGY_HORIZONTALLY),
+    ],
+)
+def test_simulate_trips_agrees_with_crowd(probability_of_traffic_light, strategy):
+    traffic_ligths, crowd, origins = crowd_of(
+        12, probability_of_traffic_light, strategy, seed=3
+    )
+    arrival_times, waiting_times = simulate_trips(
+        grid_of(traffic_ligths),
+        origins,
+        crowd.destinations,
+        np.array(crowd.departure_times),
+        strategy,
+    )
+    assert (arrival_times == np.array(crowd.arrival_times)).all()
+    assert (waiting_times == np.array(crowd.waiting_times)).all()
+
+
+@pytest.mark.parametrize("strategy", [STRATEGY_RANDOM, STRATEGY_DIAGONALLY])
+def test_lookahead_does_not_change_the_results(strategy):
+    results = []
+    for lookahead in [0, 120, math.inf]:
+        _, crowd, _ = crowd_of(10, 0.5, strategy, lookahead, seed=4)
+        results.append((crowd.arrival_times, crowd.waiting_times))
+    assert results[0] == results[1] == results[2]
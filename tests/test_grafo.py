@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from pedestrian_walk.city_as_graph import (
+    ImplicitSquareCity,
+    create_square_city,
+    create_square_city_csr,
+)
+from pedestrian_walk.grafo import Grafo, GrafoCSR
+
+
+def edges_of(grafo) -> dict:
+    return {
+        tuple(v): sorted(
+            (tuple(w), float(peso)) for w, peso in grafo.adyacentes_con_peso(v)
+        )
+        for v in grafo
+    }
+
+
+@pytest.mark.parametrize("size", [1, 4, 9])
+def test_square_cities_are_the_same_graph(size):
+    expected = edges_of(create_square_city(size))
+    assert edges_of(create_square_city_csr(size)) == expected
+    assert edges_of(GrafoCSR.desde_grafo(create_square_city(size))) == expected
+    assert edges_of(ImplicitSquareCity(size)) == expected
+
+
+@pytest.mark.parametrize("es_dirigido", [False, True])
+def test_edges_from_arrays_keep_the_last_weight(es_dirigido):
+    # repeated edges, also in opposite directions, like Grafo.arista
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        origenes = rng.integers(0, 4, size=(30, 2))
+        destinos = rng.integers(0, 4, size=(30, 2))
+        pesos = rng.random(30)
+
+        grafo = Grafo(es_dirigido)
+        for v in np.concatenate([origenes, destinos]).tolist():
+            grafo[tuple(v)] = None
+        for v, w, peso in zip(origenes.tolist(), destinos.tolist(), pesos.tolist()):
+            grafo.arista(tuple(v), tuple(w), peso)
+
+        csr = GrafoCSR.desde_aristas(origenes, destinos, pesos, es_dirigido)
+        assert edges_of(csr) == edges_of(grafo)
+
+
+@pytest.mark.parametrize(
+    "grafo",
+    [
+        create_square_city_csr(5),
+        GrafoCSR.desde_grafo(create_square_city(3)),
+    ],
+    ids=["grid", "integers"],
+)
+def test_save_and_load(tmp_path, grafo):
+    ruta = tmp_path / "city.bin"
+    grafo.guardar(ruta)
+    cargado = GrafoCSR.cargar(ruta)
+
+    assert cargado.es_dirigido == grafo.es_dirigido
+    assert (cargado.inicios == grafo.inicios).all()
+    assert (cargado.destinos == grafo.destinos).all()
+    assert (cargado.pesos == grafo.pesos).all()
+    assert edges_of(cargado) == edges_of(grafo)
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from pedestrian_walk.city import START_POINT, create_traffic_ligths, end_point_of
+from pedestrian_walk.city_as_graph import (
+    ImplicitSquareCity,
+    create_square_city,
+    earliest_arrival,
+)
+from pedestrian_walk.profile_search import (
+    CYCLE,
+    EPSILON,
+    profile_route,
+    profile_search,
+)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_profile_agrees_with_earliest_arrival(seed):
+    rng = random.Random(seed)
+    city_size = rng.choice([1, 3, 6])
+    traffic_ligths = create_traffic_ligths(city_size, rng.choice([1, 0.5]), rng)
+    city = create_square_city(city_size)
+    end = end_point_of(city_size)
+    profiles = profile_search(city, traffic_ligths, START_POINT, end)
+    profile = profiles[end]
+
+    # off the ends of the pieces, where the arrival jumps and either side is
+    # right up to rounding
+    for k in range(120):
+        departure_time = k * CYCLE / 120 + 0.0137
+        _, arrival_time, _ = earliest_arrival(
+            city, traffic_ligths, START_POINT, end, departure_time
+        )
+        assert profile.arrival_time(departure_time) == pytest.approx(arrival_time)
+        route = profile_route(profiles, end, departure_time)
+        assert route[0] == START_POINT and route[-1] == end
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_profiles_are_fifo_without_slivers(seed):
+    rng = random.Random(seed)
+    city_size = rng.randint(5, 20)
+    traffic_ligths = create_traffic_ligths(city_size, rng.choice([1, 0.7]), rng)
+    end = end_point_of(city_size)
+    profile = profile_search(
+        ImplicitSquareCity(city_size), traffic_ligths, START_POINT, end
+    )[end]
+
+    assert profile.is_fifo()
+    assert all(hi - lo > EPSILON for lo, hi, _, _, _ in profile.pieces)
+    # just after the worst departure, it starts a piece
+    departure_time, travel_time = profile.worst_departure()
+    departure_time += 1e-6
+    _, arrival_time, _ = earliest_arrival(
+        create_square_city(city_size), traffic_ligths, START_POINT, end, departure_time
+    )
+    assert arrival_time - departure_time == pytest.approx(travel_time, abs=1e-5)
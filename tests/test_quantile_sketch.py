@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from pedestrian_walk.quantile_sketch import RELATIVE_ACCURACY, QuantileSketch
+
+
+def values_of(seed: int) -> np.ndarray:
+    # waiting times: many zeros and a long tail
+    rng = np.random.default_rng(seed)
+    values = rng.exponential(60, 20000)
+    values[rng.random(20000) < 0.2] = 0
+    return values
+
+
+def test_add_and_add_many_agree():
+    values = values_of(1)
+    one_by_one, at_once = QuantileSketch(), QuantileSketch()
+    for value in values:
+        one_by_one.add(value)
+    at_once.add_many(values[:7000])
+    at_once.add_many(values[7000:])
+
+    assert (one_by_one.counts == at_once.counts).all()
+    assert one_by_one.zero_count == at_once.zero_count
+    assert one_by_one.count == at_once.count
+    assert (one_by_one.min, one_by_one.max) == (at_once.min, at_once.max)
+
+
+def test_merge_is_exact():
+    values = values_of(2)
+    whole, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    whole.add_many(values)
+    first.add_many(values[:5000])
+    second.add_many(values[5000:])
+    first.merge(second)
+    assert (whole.counts == first.counts).all()
+    assert whole.quantiles([0.5, 0.95, 0.99]) == first.quantiles([0.5, 0.95, 0.99])
+
+
+@pytest.mark.parametrize("q", [0, 0.1, 0.5, 0.9, 0.95, 0.99, 1])
+def test_quantiles_within_the_relative_accuracy(q):
+    values = values_of(3)
+    sketch = QuantileSketch()
+    sketch.add_many(values)
+    exact = np.quantile(values, q, method="lower")
+    assert abs(sketch.quantile(q) - exact) <= RELATIVE_ACCURACY * exact
@@ -0,0 +1,50 @@
+import numpy as np
+
+from pedestrian_walk.config import SimulationConfig
+from pedestrian_walk.result_cache import cached_cell, cell_key, load_cell, save_cell
+from pedestrian_walk.size_sweep import cell_parameters
+
+
+def test_key_does_not_depend_on_the_order():
+    assert cell_key({"a": 1, "b": 2.5}) == cell_key({"b": 2.5, "a": 1})
+    assert cell_key({"a": 1}) != cell_key({"a": 2})
+
+
+def test_key_does_not_depend_on_the_numeric_types():
+    config = SimulationConfig(probability_of_traffic_light=1.0, seed=3)
+    same = [
+        SimulationConfig(probability_of_traffic_light=1, seed=3),
+        SimulationConfig(probability_of_traffic_light=np.float32(1), seed=np.int64(3)),
+    ]
+    key = cell_key(cell_parameters(config))
+    assert all(cell_key(cell_parameters(other)) == key for other in same)
+
+
+def test_key_is_stable():
+    # a key that changes drops every cell stored so far, bump ENGINE_VERSION
+    # instead when the results change
+    parameters = {"city_size": 7, "probability_of_traffic_light": 0.5, "seed": 1}
+    assert (
+        cell_key(parameters)
+        == "9331ed709ab94fdd41139d7534e09fcb5e4aa23dfc11beef073c711138c29eab"
+    )
+
+
+def test_cells_are_stored_once(tmp_path):
+    calls = []
+
+    def simulate():
+        calls.append(None)
+        return 1.5, np.float64(2)
+
+    assert cached_cell({"a": 1}, simulate, tmp_path) == (1.5, 2.0)
+    assert cached_cell({"a": 1}, simulate, tmp_path) == (1.5, 2.0)
+    assert len(calls) == 1
+
+
+def test_broken_cells_are_ignored(tmp_path):
+    key = cell_key({"a": 1})
+    save_cell(key, (1.0, 2.0), tmp_path)
+    path = tmp_path / f"{key}.cell"
+    path.write_bytes(path.read_bytes()[:-3])
+    assert load_cell(key, tmp_path) is None
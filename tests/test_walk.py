@@ -0,0 +1,125 @@
+import random
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from pedestrian_walk.analytic_walk import expected_times
+from pedestrian_walk.city import STRATEGYS, create_traffic_ligths, end_point_of
+from pedestrian_walk.config import SimulationConfig
+from pedestrian_walk.crossing_policy import solve_policy
+from pedestrian_walk.kernels import KERNELS, run
+from pedestrian_walk.running_statistics import RunningStatistics
+from pedestrian_walk.size_sweep import walk_every_size
+from pedestrian_walk.traffic_light_grid import TrafficLightGrid
+from pedestrian_walk.vectorized_walk import simulate_walks
+from pedestrian_walk.walk import run_experiments, walk
+
+
+def grid_of(traffic_ligths: list) -> TrafficLightGrid:
+    # a TrafficLightGrid of one experiment with the lights of create_traffic_ligths
+    lights = [light for row in traffic_ligths for light in row]
+    shape = (1, len(traffic_ligths), len(traffic_ligths[0]))
+    present = np.array([light is not None for light in lights]).reshape(shape)
+    return TrafficLightGrid(
+        np.array(
+            [0 if light is None else light.initial_green_direction for light in lights]
+        ).reshape(shape),
+        np.array(
+            [0.0 if light is None else light.initial_time for light in lights]
+        ).reshape(shape),
+        None if present.all() else present,
+        len(traffic_ligths) - 1,
+    )
+
+
+@pytest.mark.parametrize("probability_of_traffic_light", [1, 0.6])
+@pytest.mark.parametrize("strategy", STRATEGYS[1:])
+def test_scalar_and_vectorized_walks_agree(probability_of_traffic_light, strategy):
+    rng = random.Random(1)
+    for _ in range(200):
+        city_size = rng.randint(1, 8)
+        traffic_ligths = create_traffic_ligths(
+            city_size, probability_of_traffic_light, rng
+        )
+        expected = walk(traffic_ligths, end_point_of(city_size), strategy, rng)
+        times, waiting_times = simulate_walks(grid_of(traffic_ligths), strategy)
+        assert (times[0], waiting_times[0]) == expected
+
+
+@pytest.mark.parametrize("engine", list(KERNELS))
+def test_kernels_are_reproducible(engine):
+    config = SimulationConfig(
+        city_size=5,
+        probability_of_traffic_light=0.7,
+        number_of_experiments=2000,
+        seed=3,
+        engine=engine,
+    )
+    assert run(config) == run(config)
+    assert run(replace(config, workers=2)) == run(replace(config, workers=2))
+
+
+@pytest.mark.parametrize("probability_of_traffic_light", [1, 0.5])
+@pytest.mark.parametrize("strategy", STRATEGYS)
+def test_simulation_agrees_with_analytic(probability_of_traffic_light, strategy):
+    city_size = 6
+    _, expected_waiting_time = expected_times(
+        city_size, probability_of_traffic_light, strategy
+    )
+    rng = np.random.default_rng(4)
+    traffic_ligths = TrafficLightGrid.random(
+        200000, city_size, rng, probability_of_traffic_light
+    )
+    _, waiting_times = simulate_walks(traffic_ligths, strategy, rng)
+
+    statistics = RunningStatistics()
+    statistics.add_many(waiting_times)
+    assert abs(statistics.mean - expected_waiting_time) < 4 * statistics.standard_error
+
+
+@pytest.mark.parametrize("engine", ["scalar", "vectorized", "hashed"])
+def test_kernels_agree_with_analytic(engine):
+    config = SimulationConfig(
+        city_size=5,
+        probability_of_traffic_light=0.8,
+        number_of_experiments=20000,
+        seed=7,
+        engine=engine,
+    )
+    expected_time, _ = expected_times(
+        config.city_size, config.probability_of_traffic_light, config.strategy
+    )
+    total_time, _ = run(config)
+    # the time of a walk of size 5 varies by about 1 minute
+    assert abs(total_time / config.number_of_experiments - expected_time) < 2
+
+
+@pytest.mark.parametrize("probability_of_traffic_light", [1, 0.6])
+@pytest.mark.parametrize("strategy", STRATEGYS[1:])
+def test_every_size_agrees_with_its_top_left_city(
+    probability_of_traffic_light, strategy
+):
+    rng = np.random.default_rng(2)
+    traffic_ligths = TrafficLightGrid.random(300, 9, rng, probability_of_traffic_light)
+    times, waiting_times = walk_every_size(traffic_ligths, strategy, rng)
+    for city_size in range(1, 10):
+        expected = simulate_walks(traffic_ligths.top_left(city_size), strategy, rng)
+        assert (times[city_size - 1] == expected[0]).all()
+        assert (waiting_times[city_size - 1] == expected[1]).all()
+
+
+def test_policy_agrees_with_simulation():
+    config = SimulationConfig(city_size=4, number_of_experiments=20000, seed=5)
+    policy = solve_policy(config.city_size)
+    _, expected_waiting_time = policy.expected_times()
+    _, total_waiting_time = run_experiments(config, policy=policy)
+    waiting_time = total_waiting_time / config.number_of_experiments
+    # the standard error is about 0.3 s
+    assert abs(waiting_time - expected_waiting_time) < 1
+
+
+@pytest.mark.parametrize("phase_bins", [0, 7, 121])
+def test_policy_needs_an_even_number_of_bins(phase_bins):
+    with pytest.raises(ValueError):
+        solve_policy(3, phase_bins=phase_bins)